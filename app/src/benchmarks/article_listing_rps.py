@@ -0,0 +1,108 @@
+import asyncio
+import time
+
+from fastapi import Depends, FastAPI
+from starlette import status
+
+from depends.cache import get_article_cache_service, get_total_count_service
+from depends.db import get_article_service
+from dto.article import ShortArticleDTO, ShortCategoryDTO
+from routers import root_router
+from schemas.v1.article import ShortArticleResponse
+from schemas.v1.category import ShortCategoryResponse
+from services.database.base import DEFAULT_LIMIT
+
+DURATION = 5
+CATEGORIES_PER_ARTICLE = 3
+
+
+class FakeArticleService:
+    def __init__(self):
+        self._articles = [
+            ShortArticleDTO(id=article_id,
+                            title=f'title {article_id}',
+                            categories=[ShortCategoryDTO(id=category_id,
+                                                         name=f'category {category_id}')
+                                        for category_id in range(CATEGORIES_PER_ARTICLE)])
+            for article_id in range(DEFAULT_LIMIT, 0, -1)
+        ]
+
+    async def get_list(self, **kwargs) -> list[ShortArticleDTO]:
+        return self._articles
+
+
+class NoCache:
+    async def get_list(self, **params) -> None:
+        return None
+
+    async def set_list(self, data: bytes, **params) -> None:
+        pass
+
+
+article_service = FakeArticleService()
+
+
+async def get_legacy_articles(service: FakeArticleService = Depends(get_article_service)):
+    return [ShortArticleResponse(id=article.id,
+                                 title=article.title,
+                                 categories=
+                                 [ShortCategoryResponse(id=category.id,
+                                                        name=category.name)
+                                  for category in article.categories])
+            for article in await service.get_list()]
+
+
+def build_app() -> FastAPI:
+    app = FastAPI()
+    app.include_router(root_router)
+    app.add_api_route('/legacy/articles', get_legacy_articles,
+                      response_model=list[ShortArticleResponse],
+                      status_code=status.HTTP_200_OK)
+    app.dependency_overrides[get_article_service] = lambda: article_service
+    app.dependency_overrides[get_article_cache_service] = NoCache
+    app.dependency_overrides[get_total_count_service] = lambda: None
+    return app
+
+
+async def request(app: FastAPI, path: str) -> int:
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1',
+        'method': 'GET', 'scheme': 'http', 'path': path,
+        'raw_path': path.encode(), 'query_string': b'', 'root_path': '',
+        'headers': [(b'host', b'benchmark')],
+        'client': ('127.0.0.1', 0), 'server': ('benchmark', 80),
+    }
+    sent: dict = {}
+
+    async def receive() -> dict:
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message: dict) -> None:
+        if message['type'] == 'http.response.start':
+            sent['status'] = message['status']
+
+    await app(scope, receive, send)
+    return sent['status']
+
+
+async def measure(app: FastAPI, path: str) -> float:
+    assert await request(app, path) == status.HTTP_200_OK
+    requests = 0
+    started_at = time.perf_counter()
+    while time.perf_counter() - started_at < DURATION:
+        await request(app, path)
+        requests += 1
+    return requests / (time.perf_counter() - started_at)
+
+
+async def main() -> None:
+    app = build_app()
+    legacy = await measure(app, '/legacy/articles')
+    fast = await measure(app, '/api/v1/articles')
+    print(f'{"response_model + json":<24}{legacy:>10.0f} req/s')
+    print(f'{"orjson response":<24}{fast:>10.0f} req/s')
+    print(f'{"speedup":<24}{fast / legacy:>10.2f}x')
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
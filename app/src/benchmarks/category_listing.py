@@ -0,0 +1,83 @@
+import asyncio
+import time
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from core.settings import SETTINGS
+from services.database.article import ArticleService
+
+BENCHMARK_EMAIL = 'category_listing@benchmark.local'
+CATEGORY_SIZES = (1_000, 100_000, 1_000_000)
+ITERATIONS = 50
+
+
+async def seed(session_factory: sessionmaker) -> dict[int, int]:
+    async with session_factory() as session, session.begin():
+        user_id = (await session.execute(text(
+            "INSERT INTO users (email, password_hash, is_verified) "
+            "VALUES (:email, '', true) RETURNING id"
+        ), {"email": BENCHMARK_EMAIL})).scalar()
+        first_id = (await session.execute(text(
+            "INSERT INTO articles (title, text, user_id) "
+            "SELECT 'title ' || n, 'text ' || n, :user_id "
+            "FROM generate_series(1, :count) AS n RETURNING id"
+        ), {"user_id": user_id, "count": max(CATEGORY_SIZES)})).scalars().first()
+        categories: dict[int, int] = {}
+        for size in CATEGORY_SIZES:
+            category_id = (await session.execute(text(
+                "INSERT INTO categories (name, user_id) "
+                "VALUES (:name, :user_id) RETURNING id"
+            ), {"name": f"bench {size}", "user_id": user_id})).scalar()
+            await session.execute(text(
+                "INSERT INTO category_to_articles (category_id, article_id) "
+                "SELECT :category_id, id FROM articles "
+                "WHERE user_id = :user_id ORDER BY id LIMIT :size"
+            ), {"category_id": category_id, "user_id": user_id, "size": size})
+            categories[size] = category_id
+        await session.execute(text("ANALYZE articles"))
+        await session.execute(text("ANALYZE category_to_articles"))
+    return categories
+
+
+async def cleanup(session_factory: sessionmaker) -> None:
+    async with session_factory() as session, session.begin():
+        await session.execute(text("DELETE FROM users WHERE email = :email"),
+                              {"email": BENCHMARK_EMAIL})
+
+
+async def measure(session_factory: sessionmaker, **kwargs) -> float:
+    started_at = time.perf_counter()
+    for _ in range(ITERATIONS):
+        async with session_factory() as session:
+            await ArticleService(session_or_pool=session).get_list(**kwargs)
+    return (time.perf_counter() - started_at) / ITERATIONS * 1000
+
+
+async def main() -> None:
+    engine = create_async_engine(SETTINGS.POSTGRES.build_url())
+    session_factory = sessionmaker(bind=engine, expire_on_commit=False,
+                                   class_=AsyncSession)
+    await cleanup(session_factory)
+    categories = await seed(session_factory)
+    try:
+        print(f"{'category size':>14}{'first page':>14}{'middle page':>14}")
+        for size, category_id in categories.items():
+            async with session_factory() as session:
+                middle_id = (await session.execute(text(
+                    "SELECT article_id FROM category_to_articles "
+                    "WHERE category_id = :category_id "
+                    "ORDER BY article_id DESC OFFSET :offset LIMIT 1"
+                ), {"category_id": category_id, "offset": size // 2})).scalar()
+            first_page = await measure(session_factory, category_id=category_id)
+            middle_page = await measure(session_factory, category_id=category_id,
+                                        after_id=middle_id)
+            print(f"{size:>14}{first_page:>12.2f}ms{middle_page:>12.2f}ms")
+    finally:
+        await cleanup(session_factory)
+        await engine.dispose()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
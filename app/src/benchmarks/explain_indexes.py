@@ -0,0 +1,50 @@
+import asyncio
+import json
+import sys
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from core.settings import SETTINGS
+
+# Запрос -> индекс, который планировщик обязан выбрать
+CHECKS: dict[str, str] = {
+    "SELECT id, title FROM articles ORDER BY id DESC LIMIT 50":
+        "articles_pkey",
+    "SELECT id FROM articles WHERE user_id = 1":
+        "ix_articles_user_id",
+    "SELECT id FROM categories WHERE user_id = 1":
+        "ix_categories_user_id",
+    "SELECT article_id FROM category_to_articles WHERE category_id = 1":
+        "category_to_articles_pkey",
+    "SELECT category_id FROM category_to_articles WHERE article_id IN (1, 2, 3)":
+        "ix_category_to_articles_article_id",
+}
+
+
+def collect_indexes(plan: dict) -> set[str]:
+    indexes = {plan["Index Name"]} if "Index Name" in plan else set()
+    for child in plan.get("Plans", []):
+        indexes |= collect_indexes(child)
+    return indexes
+
+
+async def main() -> int:
+    engine = create_async_engine(SETTINGS.POSTGRES.build_url())
+    failed = 0
+    async with engine.begin() as conn:
+        await conn.execute(text("SET LOCAL enable_seqscan = off"))
+        for query, index in CHECKS.items():
+            result = await conn.execute(text(f"EXPLAIN (FORMAT JSON) {query}"))
+            plan = result.scalar()
+            plan = json.loads(plan) if isinstance(plan, str) else plan
+            used = collect_indexes(plan[0]["Plan"])
+            ok = index in used
+            failed += not ok
+            print(f"{'ok' if ok else 'FAIL':<6}{index:<40}{query}")
+    await engine.dispose()
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(asyncio.run(main()))
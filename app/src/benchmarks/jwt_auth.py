@@ -0,0 +1,27 @@
+import timeit
+
+from core.jwt import JWTRepository
+
+ITERATIONS = 20000
+SECRET_KEY = 'benchmark_secret_key'
+
+
+def bench(name: str, jwt_repository: JWTRepository, token: str) -> None:
+    jwt_repository.access.get_payload(token)
+    seconds = timeit.timeit(lambda: jwt_repository.access.get_payload(token),
+                            number=ITERATIONS)
+    print(f'{name:<24}{seconds / ITERATIONS * 1_000_000:>10.2f} us/request')
+
+
+def main() -> None:
+    token = JWTRepository(secret_key=SECRET_KEY).access.create(1).token
+    bench('jose', JWTRepository(secret_key=SECRET_KEY), token)
+    bench('fast hs256', JWTRepository(secret_key=SECRET_KEY,
+                                      fast_hs256=True), token)
+    bench('jose + cache', JWTRepository(secret_key=SECRET_KEY,
+                                        cache_size=1000,
+                                        cache_ttl=300), token)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+import asyncio
+import time
+
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from core.settings import SETTINGS
+from core.statement_cache import StatementCache
+from services.database import base
+from services.database.article import ArticleService
+from services.database.category import CategoryService
+
+ITERATIONS = 2000
+
+
+async def run_queries(session_factory: sessionmaker) -> None:
+    async with session_factory() as session:
+        article_service = ArticleService(session_or_pool=session)
+        category_service = CategoryService(session_or_pool=session)
+        await article_service.get_list(after_id=1_000_000)
+        await article_service.get_extended_by_id(id=1)
+        await category_service.get_by_id(id=1)
+        await category_service.exists_list([1, 2, 3])
+
+
+async def measure(session_factory: sessionmaker) -> float:
+    await run_queries(session_factory)
+    started_at = time.perf_counter()
+    for _ in range(ITERATIONS):
+        await run_queries(session_factory)
+    return (time.perf_counter() - started_at) / ITERATIONS * 1000
+
+
+async def main() -> None:
+    engine = create_async_engine(SETTINGS.POSTGRES.build_url())
+    session_factory = sessionmaker(bind=engine, expire_on_commit=False,
+                                   class_=AsyncSession)
+    try:
+        base.statement_cache = StatementCache(maxsize=0)
+        uncached = await measure(session_factory)
+        base.statement_cache = StatementCache(maxsize=base.STATEMENT_CACHE_SIZE)
+        cached = await measure(session_factory)
+    finally:
+        await engine.dispose()
+    print(f'{"without templates":<20}{uncached:>10.3f} ms/request')
+    print(f'{"with templates":<20}{cached:>10.3f} ms/request')
+    print(base.statement_cache.get_stats())
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,24 @@
+import base64
+import binascii
+import json
+from typing import Any
+
+
+class CursorError(Exception):
+    pass
+
+
+def encode_cursor(*values: Any) -> str:
+    raw = json.dumps(values, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str, size: int = 1) -> list[Any]:
+    padding = '=' * (-len(cursor) % 4)
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + padding))
+    except (binascii.Error, ValueError):
+        raise CursorError("Bad cursor")
+    if not isinstance(values, list) or len(values) != size:
+        raise CursorError("Bad cursor")
+    return values
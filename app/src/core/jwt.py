@@ -1,11 +1,18 @@
+import base64
+import hashlib
+import hmac
+import json
+import time
 from datetime import datetime, timedelta
 from enum import Enum
 from typing import Optional
 
-from jose import jwt, JWTError, JWSError
+from jose import jwt, JWTError, JWSError, ExpiredSignatureError
 from pydantic.main import BaseModel
 from pydantic.types import UUID4
 
+from core.cache import TTLCache
+
 
 class JWTTypeError(Exception):
     pass
@@ -32,18 +39,57 @@ class TokenTypes(Enum):
     REFRESH = 'refresh'
 
 
+def _b64decode(value: str) -> bytes:
+    return base64.urlsafe_b64decode(value + '=' * (-len(value) % 4))
+
+
+def decode_hs256(token: str, secret_key: str) -> dict:
+    try:
+        header_segment, payload_segment, signature_segment = token.split('.')
+        header = json.loads(_b64decode(header_segment))
+        signature = _b64decode(signature_segment)
+    except (ValueError, TypeError):
+        raise JWTError("Invalid token")
+    if not isinstance(header, dict) or header.get("alg") != "HS256":
+        raise JWTError("The specified alg value is not allowed")
+    expected_signature = hmac.new(secret_key.encode(),
+                                  f'{header_segment}.{payload_segment}'.encode(),
+                                  hashlib.sha256).digest()
+    if not hmac.compare_digest(expected_signature, signature):
+        raise JWTError("Signature verification failed.")
+    try:
+        payload = json.loads(_b64decode(payload_segment))
+    except (ValueError, TypeError):
+        raise JWTError("Invalid payload string")
+    if not isinstance(payload, dict):
+        raise JWTError("Invalid payload string")
+    now = time.time()
+    try:
+        if "exp" in payload and float(payload["exp"]) < now:
+            raise ExpiredSignatureError("Signature has expired.")
+        if "nbf" in payload and float(payload["nbf"]) > now:
+            raise JWTError("The token is not yet valid (nbf)")
+    except (ValueError, TypeError):
+        raise JWTError("Invalid token claims")
+    return payload
+
+
 class JWTTokenFactory:
     _type: Optional[TokenTypes] = None
     _algorithm: str = "HS256"
 
     def __init__(self,
                  secret_key: str,
-                 lifetime_minutes: int):
+                 lifetime_minutes: int,
+                 cache: TTLCache | None = None,
+                 fast_hs256: bool = False):
         if not self._type:
             raise NotImplementedError
         self._secret_key: str = secret_key
         self._lifetime_minutes: int = lifetime_minutes
         self._payload: dict = {}
+        self._cache: TTLCache | None = cache
+        self._fast_hs256: bool = fast_hs256 and self._algorithm == "HS256"
 
     def create(self, identifier: str) -> TokenDataDTO:
         self._payload = {}
@@ -59,16 +105,31 @@ class JWTTokenFactory:
                             sub=identifier)
 
     def get_payload(self, token: str) -> TokenPayloadDTO:
+        cache_key: bytes | None = None
+        if self._cache is not None:
+            cache_key = hashlib.sha256(token.encode()).digest()
+            cached: TokenPayloadDTO | None = self._cache.get(cache_key)
+            if cached is not None:
+                if cached.exp.timestamp() >= time.time():
+                    return cached
+                self._cache.pop(cache_key)
         try:
-            payload = jwt.decode(token,
-                                 self._secret_key,
-                                 algorithms=self._algorithm)
+            if self._fast_hs256:
+                payload = decode_hs256(token, self._secret_key)
+            else:
+                payload = jwt.decode(token,
+                                     self._secret_key,
+                                     algorithms=self._algorithm)
         except (JWTError, JWSError):
             raise
         if payload.get("type") != self._type:
             raise JWTTypeError(f"Type {payload.get('type')} "
                                "not supported")
-        return TokenPayloadDTO(**payload)
+        token_payload = TokenPayloadDTO(**payload)
+        if cache_key is not None:
+            self._cache.set(cache_key, token_payload,
+                            ttl=token_payload.exp.timestamp() - time.time())
+        return token_payload
 
     def _set_exp(self) -> None:
         self._payload["exp"] = (datetime.utcnow() +
@@ -96,8 +157,14 @@ class RefreshJWTTokenFactory(JWTTokenFactory):
 
 class JWTRepository:
     def __init__(self,
-                 secret_key: str
+                 secret_key: str,
+                 cache_size: int = 0,
+                 cache_ttl: int = 0,
+                 fast_hs256: bool = False
                  ):
         self.access = AccessJWTTokenFactory(
             secret_key=secret_key,
-            lifetime_minutes=99999999)
+            lifetime_minutes=99999999,
+            cache=TTLCache(maxsize=cache_size,
+                           ttl=cache_ttl) if cache_size > 0 else None,
+            fast_hs256=fast_hs256)
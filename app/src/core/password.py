@@ -1,4 +1,10 @@
+import asyncio
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable
+
 from passlib.context import CryptContext
+from pydantic import BaseModel
 
 pwd_context = CryptContext(schemes=["bcrypt"],
                            deprecated="auto")
@@ -14,6 +20,77 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+class PasswordHasherStatsDTO(BaseModel):
+    max_concurrency: int
+    queued: int
+    running: int
+    completed: int
+    wait_seconds_total: float
+    wait_seconds_max: float
+
+
+class PasswordHasher:
+    def __init__(self, executor: Executor, max_concurrency: int):
+        self._executor: Executor = executor
+        self._max_concurrency: int = max_concurrency
+        self._semaphore: asyncio.Semaphore | None = None
+        self._queued: int = 0
+        self._running: int = 0
+        self._completed: int = 0
+        self._wait_seconds_total: float = 0
+        self._wait_seconds_max: float = 0
+
+    @classmethod
+    def from_pool(cls, kind: str, workers: int,
+                  max_concurrency: int) -> "PasswordHasher":
+        if kind == "process":
+            executor: Executor = ProcessPoolExecutor(max_workers=workers)
+        elif kind == "thread":
+            executor = ThreadPoolExecutor(max_workers=workers,
+                                          thread_name_prefix="bcrypt")
+        else:
+            raise ValueError(f"Unknown executor {kind}")
+        return cls(executor=executor, max_concurrency=max_concurrency)
+
+    async def _run(self, func: Callable[..., Any], *args: Any) -> Any:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self._max_concurrency)
+        queued_at = time.perf_counter()
+        self._queued += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self._queued -= 1
+        wait_seconds = time.perf_counter() - queued_at
+        self._wait_seconds_total += wait_seconds
+        self._wait_seconds_max = max(self._wait_seconds_max, wait_seconds)
+        self._running += 1
+        try:
+            return await asyncio.get_running_loop(). \
+                run_in_executor(self._executor, func, *args)
+        finally:
+            self._running -= 1
+            self._completed += 1
+            self._semaphore.release()
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(verify_password, plain_password, hashed_password)
+
+    async def hash(self, password: str) -> str:
+        return await self._run(get_password_hash, password)
+
+    def get_stats(self) -> PasswordHasherStatsDTO:
+        return PasswordHasherStatsDTO(max_concurrency=self._max_concurrency,
+                                      queued=self._queued,
+                                      running=self._running,
+                                      completed=self._completed,
+                                      wait_seconds_total=self._wait_seconds_total,
+                                      wait_seconds_max=self._wait_seconds_max)
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
 if __name__ == "__main__":
     pwd = "string12"
     print(get_password_hash(pwd))
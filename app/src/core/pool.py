@@ -0,0 +1,51 @@
+import time
+
+from pydantic import BaseModel
+from sqlalchemy.exc import TimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+
+class PoolStatsDTO(BaseModel):
+    size: int
+    checked_out: int
+    overflow: int
+    overflow_max: int
+    checkouts: int
+    timeouts: int
+    wait_seconds_total: float
+    wait_seconds_max: float
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._checkouts: int = 0
+        self._timeouts: int = 0
+        self._overflow_max: int = 0
+        self._wait_seconds_total: float = 0
+        self._wait_seconds_max: float = 0
+
+    def connect(self):
+        started_at = time.perf_counter()
+        try:
+            connection = super().connect()
+        except TimeoutError:
+            self._timeouts += 1
+            raise
+        finally:
+            wait_seconds = time.perf_counter() - started_at
+            self._wait_seconds_total += wait_seconds
+            self._wait_seconds_max = max(self._wait_seconds_max, wait_seconds)
+        self._checkouts += 1
+        self._overflow_max = max(self._overflow_max, self.overflow())
+        return connection
+
+    def get_stats(self) -> PoolStatsDTO:
+        return PoolStatsDTO(size=self.size(),
+                            checked_out=self.checkedout(),
+                            overflow=max(self.overflow(), 0),
+                            overflow_max=self._overflow_max,
+                            checkouts=self._checkouts,
+                            timeouts=self._timeouts,
+                            wait_seconds_total=self._wait_seconds_total,
+                            wait_seconds_max=self._wait_seconds_max)
@@ -0,0 +1,31 @@
+import time
+from collections import OrderedDict, deque
+from typing import Hashable
+
+
+class SlidingWindowLimiter:
+    def __init__(self, maxsize: int):
+        self._maxsize: int = maxsize
+        self._hits: OrderedDict[Hashable, deque[float]] = OrderedDict()
+
+    def hit(self, key: Hashable, limit: int, window: float) -> float | None:
+        """Registers a hit and returns seconds to wait if the limit is reached."""
+        now = time.monotonic()
+        hits = self._hits.get(key)
+        if hits is None:
+            hits = self._hits[key] = deque()
+        self._hits.move_to_end(key)
+        while hits and hits[0] <= now - window:
+            hits.popleft()
+        if len(hits) >= limit:
+            return hits[0] + window - now
+        hits.append(now)
+        while len(self._hits) > self._maxsize:
+            self._hits.popitem(last=False)
+        return None
+
+    def clear(self) -> None:
+        self._hits.clear()
+
+    def __len__(self) -> int:
+        return len(self._hits)
@@ -0,0 +1,26 @@
+from typing import Any
+
+import orjson
+from pydantic import BaseModel
+from starlette.responses import JSONResponse
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return value.dict()
+    raise TypeError
+
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, default=_default)
+
+
+class ORJSONResponse(JSONResponse):
+    """Renders already built content without a second validation pass.
+
+    Returned from a handler it bypasses ``response_model`` validation and
+    ``jsonable_encoder``, so the content must match the declared model.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
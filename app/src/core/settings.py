@@ -1,3 +1,5 @@
+import os
+
 from dotenv import load_dotenv
 from pydantic import BaseSettings
 
@@ -6,6 +8,9 @@ load_dotenv('.env')
 
 class JWT(BaseSettings):
     SECRET_KEY: str = '123'
+    CACHE_SIZE: int = 10000
+    CACHE_TTL: int = 300
+    FAST_HS256: bool = False
 
     class Config:
         env_prefix = 'JWT_'
@@ -17,6 +22,14 @@ class Postgres(BaseSettings):
     DB: str = "db"
     HOST: str = "localhost"
     PORT: str = "5432"
+    POOL_SIZE: int = 5
+    MAX_OVERFLOW: int = 10
+    POOL_TIMEOUT: float = 30
+    POOL_PRE_PING: bool = False
+    POOL_RECYCLE: int = -1
+    STATEMENT_TIMEOUT: int = 0
+    STATEMENT_CACHE_SIZE: int = 100
+    WARMUP_CONNECTIONS: int = 5
 
     class Config:
         env_prefix = 'POSTGRES_'
@@ -26,10 +39,19 @@ class Postgres(BaseSettings):
                f'{self.USER}:{self.PASSWORD}@' \
                f'{self.HOST}:{self.PORT}/{self.DB}'
 
+    def build_server_settings(self) -> dict[str, str]:
+        server_settings = {'application_name': "article_api"}
+        if self.STATEMENT_TIMEOUT:
+            server_settings['statement_timeout'] = str(self.STATEMENT_TIMEOUT)
+        return server_settings
+
 
 class Redis(BaseSettings):
     HOST: str = "localhost"
     PORT: str = "6379"
+    MAX_CONNECTIONS: int = 50
+    SOCKET_TIMEOUT: float = 5
+    SOCKET_CONNECT_TIMEOUT: float = 5
 
     class Config:
         env_prefix = 'REDIS_'
@@ -43,17 +65,100 @@ class SMTP(BaseSettings):
     PORT: int = 587
     EMAIL: str
     PASSWORD: str
+    USE_TLS: bool = False
+    START_TLS: bool | None = None
+    TIMEOUT: float = 30
+    WORKERS: int = 2
+    QUEUE_SIZE: int = 1000
+    BATCH_SIZE: int = 20
+    MAX_RETRIES: int = 5
+    RETRY_BACKOFF: float = 1
 
     class Config:
         env_prefix = 'SMTP_'
 
 
+class Cache(BaseSettings):
+    ARTICLE_TTL: int = 300
+    ARTICLE_LIST_TTL: int = 30
+    COUNT_TTL: int = 60
+
+    class Config:
+        env_prefix = 'CACHE_'
+
+
+class UserCache(BaseSettings):
+    MAXSIZE: int = 10000
+    TTL: int = 60
+    USE_REDIS: bool = False
+    REDIS_TTL: int = 300
+
+    class Config:
+        env_prefix = 'USER_CACHE_'
+
+
+class Password(BaseSettings):
+    EXECUTOR: str = "thread"
+    WORKERS: int = 4
+    MAX_CONCURRENCY: int = 4
+
+    class Config:
+        env_prefix = 'PASSWORD_'
+
+
+class RateLimit(BaseSettings):
+    ENABLED: bool = True
+    WINDOW: int = 60
+    LOGIN: int = 10
+    SIGNUP: int = 5
+    SIGNUP_EMAIL: int = 5
+    SIGNUP_EMAIL_WINDOW: int = 3600
+    WRITE: int = 60
+    LOCAL_MAXSIZE: int = 10000
+
+    class Config:
+        env_prefix = 'RATE_LIMIT_'
+
+
+class Server(BaseSettings):
+    HOST: str = "0.0.0.0"
+    PORT: int = 8000
+    WORKERS: int = 0
+    GRACEFUL_TIMEOUT: int = 30
+    KEEPALIVE: int = 5
+    READY_TIMEOUT: float = 2
+    WARMUP_TIMEOUT: float = 10
+
+    class Config:
+        env_prefix = 'SERVER_'
+
+    def build_workers(self, debug: bool) -> int:
+        # В DEBUG при старте пересоздаётся схема, это может делать только один воркер
+        if debug:
+            return 1
+        return self.WORKERS or os.cpu_count() or 1
+
+
+class Metrics(BaseSettings):
+    ENABLED: bool = False
+    TOKEN: str = ""
+
+    class Config:
+        env_prefix = 'METRICS_'
+
+
 class Settings(BaseSettings):
     DEBUG: bool = True
     POSTGRES: Postgres = Postgres()
     REDIS: Redis = Redis()
     JWT: JWT = JWT()
     SMTP: SMTP = SMTP()
+    CACHE: Cache = Cache()
+    USER_CACHE: UserCache = UserCache()
+    PASSWORD: Password = Password()
+    RATE_LIMIT: RateLimit = RateLimit()
+    SERVER: Server = Server()
+    METRICS: Metrics = Metrics()
 
 
 SETTINGS = Settings()
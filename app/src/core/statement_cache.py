@@ -0,0 +1,51 @@
+from collections import OrderedDict
+from typing import Any, Hashable
+
+from pydantic import BaseModel
+
+
+class StatementCacheStatsDTO(BaseModel):
+    size: int
+    maxsize: int
+    hits: int
+    misses: int
+    bypasses: int
+
+
+class StatementCache:
+    def __init__(self, maxsize: int):
+        self._maxsize: int = maxsize
+        self._data: OrderedDict[Hashable, Any] = OrderedDict()
+        self._hits: int = 0
+        self._misses: int = 0
+        self._bypasses: int = 0
+
+    def get(self, key: Hashable) -> Any | None:
+        value = self._data.get(key)
+        if value is None:
+            self._misses += 1
+            return None
+        self._hits += 1
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        self._data[key] = value
+        while len(self._data) > self._maxsize:
+            self._data.popitem(last=False)
+
+    def bypass(self) -> None:
+        self._bypasses += 1
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def get_stats(self) -> StatementCacheStatsDTO:
+        return StatementCacheStatsDTO(size=len(self._data),
+                                      maxsize=self._maxsize,
+                                      hits=self._hits,
+                                      misses=self._misses,
+                                      bypasses=self._bypasses)
+
+    def __len__(self) -> int:
+        return len(self._data)
@@ -0,0 +1,5 @@
+from uvicorn.workers import UvicornWorker
+
+
+class ProductionWorker(UvicornWorker):
+    CONFIG_KWARGS = {"loop": "uvloop", "http": "httptools", "lifespan": "on"}
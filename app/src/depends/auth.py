@@ -3,6 +3,7 @@ from jose import JWSError, JWTError
 from core.jwt import JWTRepository, TokenPayloadDTO, JWTTypeError
 from depends.db import get_user_service
 from depends.jwt import get_jwt_repository
+from depends.user_cache import get_user_cache_service
 from fastapi import Depends, HTTPException
 from fastapi.security import HTTPBearer
 
@@ -10,6 +11,7 @@ from starlette import status
 
 from models import UserModel
 from services.database.user import UserService
+from services.user_cache import UserCacheService
 
 oauth2_scheme = HTTPBearer()
 
@@ -41,10 +43,16 @@ async def get_token_payload(
 async def get_user_from_jwt(
         payload: TokenPayloadDTO = Depends(get_token_payload),
         users_service: UserService = Depends(get_user_service),
+        user_cache_service: UserCacheService = Depends(get_user_cache_service),
 ) -> UserModel:
-    user: UserModel | None = await users_service.get_by_id(id=int(payload.sub))
+    user_id = int(payload.sub)
+    user: UserModel | None = await user_cache_service.get(id=user_id)
     if user:
         return user
+    user = await users_service.get_by_id(id=user_id)
+    if user:
+        await user_cache_service.set(user)
+        return user
     raise HTTPException(
         status_code=status.HTTP_403_FORBIDDEN,
         detail="Invalid token",
@@ -0,0 +1,21 @@
+from fastapi import Depends
+
+from core.settings import SETTINGS
+from depends.redis import get_redis_service
+from depends.resources import resources
+from services.cache import ArticleCacheService
+from services.count import TotalCountService
+from services.redis import RedisService
+
+
+def get_article_cache_service() -> ArticleCacheService:
+    if not resources.article_cache_service:
+        raise NotImplementedError()
+    return resources.article_cache_service
+
+
+def get_total_count_service(
+        redis_service: RedisService = Depends(get_redis_service)
+) -> TotalCountService:
+    return TotalCountService(redis_service=redis_service,
+                             ttl=SETTINGS.CACHE.COUNT_TTL)
@@ -2,17 +2,21 @@ from fastapi import Depends
 
 from depends.session import get_session
 from services.database.article import ArticleService
+from services.database.base import TransactionStrategy
 from services.database.category import CategoryService
 from services.database.user import UserService
 
 
 def get_user_service(session=Depends(get_session)) -> UserService:
-    return UserService(session_or_pool=session)
+    return UserService(session_or_pool=session,
+                       strategy=TransactionStrategy.UNIT_OF_WORK)
 
 
 def get_category_service(session=Depends(get_session)) -> CategoryService:
-    return CategoryService(session_or_pool=session)
+    return CategoryService(session_or_pool=session,
+                           strategy=TransactionStrategy.UNIT_OF_WORK)
 
 
 def get_article_service(session=Depends(get_session)) -> ArticleService:
-    return ArticleService(session_or_pool=session)
+    return ArticleService(session_or_pool=session,
+                          strategy=TransactionStrategy.UNIT_OF_WORK)
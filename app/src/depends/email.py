@@ -1,10 +1,24 @@
 from core.settings import SETTINGS
 from services.email import EmailService
+from services.email_queue import EmailQueue
 
-email_service = EmailService(host=SETTINGS.SMTP.HOST,
-                             port=SETTINGS.SMTP.PORT,
-                             email=SETTINGS.SMTP.EMAIL,
-                             password=SETTINGS.SMTP.PASSWORD)
+email_queue = EmailQueue(host=SETTINGS.SMTP.HOST,
+                         port=SETTINGS.SMTP.PORT,
+                         username=SETTINGS.SMTP.EMAIL,
+                         password=SETTINGS.SMTP.PASSWORD,
+                         use_tls=SETTINGS.SMTP.USE_TLS,
+                         start_tls=SETTINGS.SMTP.START_TLS,
+                         timeout=SETTINGS.SMTP.TIMEOUT,
+                         workers=SETTINGS.SMTP.WORKERS,
+                         maxsize=SETTINGS.SMTP.QUEUE_SIZE,
+                         batch_size=SETTINGS.SMTP.BATCH_SIZE,
+                         max_retries=SETTINGS.SMTP.MAX_RETRIES,
+                         retry_backoff=SETTINGS.SMTP.RETRY_BACKOFF)
+email_service = EmailService(queue=email_queue, sender=SETTINGS.SMTP.EMAIL)
+
+
+def get_email_queue() -> EmailQueue:
+    return email_queue
 
 
 def get_email_service() -> EmailService:
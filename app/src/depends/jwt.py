@@ -2,7 +2,10 @@ from core.settings import SETTINGS
 from core.jwt import JWTRepository
 
 jwt_repository = JWTRepository(
-    secret_key=SETTINGS.JWT.SECRET_KEY
+    secret_key=SETTINGS.JWT.SECRET_KEY,
+    cache_size=SETTINGS.JWT.CACHE_SIZE,
+    cache_ttl=SETTINGS.JWT.CACHE_TTL,
+    fast_hs256=SETTINGS.JWT.FAST_HS256,
 )
 
 
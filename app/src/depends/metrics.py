@@ -0,0 +1,24 @@
+import hmac
+
+from fastapi import Depends, HTTPException
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from starlette import status
+
+from core.settings import SETTINGS
+
+metrics_scheme = HTTPBearer(auto_error=False)
+
+
+async def check_metrics_access(
+        credentials: HTTPAuthorizationCredentials | None = Depends(metrics_scheme),
+) -> None:
+    # Выключенный эндпоинт не должен выдавать себя
+    if not SETTINGS.METRICS.ENABLED:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                            detail="Not Found")
+    if not SETTINGS.METRICS.TOKEN:
+        return
+    if credentials is None or not hmac.compare_digest(credentials.credentials,
+                                                      SETTINGS.METRICS.TOKEN):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN,
+                            detail="Invalid token")
@@ -0,0 +1,12 @@
+from core.password import PasswordHasher
+from core.settings import SETTINGS
+
+password_hasher = PasswordHasher.from_pool(
+    kind=SETTINGS.PASSWORD.EXECUTOR,
+    workers=SETTINGS.PASSWORD.WORKERS,
+    max_concurrency=SETTINGS.PASSWORD.MAX_CONCURRENCY,
+)
+
+
+def get_password_hasher() -> PasswordHasher:
+    return password_hasher
@@ -0,0 +1,56 @@
+import math
+from typing import Callable
+
+from fastapi import Depends, HTTPException, Request
+from starlette import status
+
+from core.settings import SETTINGS
+from depends.auth import get_user_from_jwt
+from depends.resources import resources
+from models import UserModel
+from services.rate_limit import RateLimitService
+
+
+def get_rate_limit_service() -> RateLimitService:
+    if not resources.rate_limit_service:
+        raise NotImplementedError()
+    return resources.rate_limit_service
+
+
+def get_client_ip(request: Request) -> str:
+    return request.client.host if request.client else 'unknown'
+
+
+def get_user_identity(user: UserModel = Depends(get_user_from_jwt)) -> str:
+    return str(user.id)
+
+
+async def check_rate_limit(service: RateLimitService,
+                           scope: str,
+                           identity: str,
+                           limit: int,
+                           window: int = SETTINGS.RATE_LIMIT.WINDOW) -> None:
+    if not SETTINGS.RATE_LIMIT.ENABLED:
+        return
+    retry_after = await service.hit(scope=scope, identity=identity,
+                                    limit=limit, window=window)
+    if retry_after is not None:
+        raise HTTPException(status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                            detail="Too many requests",
+                            headers={"Retry-After": str(math.ceil(retry_after))})
+
+
+def rate_limit(scope: str,
+               limit: int,
+               identity: Callable[..., str] = get_client_ip) -> Callable:
+    async def dependency(
+            identity_value: str = Depends(identity),
+            service: RateLimitService = Depends(get_rate_limit_service),
+    ) -> None:
+        await check_rate_limit(service, scope, identity_value, limit)
+
+    return dependency
+
+
+limit_writes = rate_limit('write', SETTINGS.RATE_LIMIT.WRITE,
+                          identity=get_user_identity)
@@ -1,8 +1,8 @@
-from core.settings import SETTINGS
+from depends.resources import resources
 from services.redis import RedisService
 
-redis_service = RedisService(connect_url=SETTINGS.REDIS.build_url())
-
 
 def get_redis_service() -> RedisService:
-    return redis_service
+    if not resources.redis_service:
+        raise NotImplementedError()
+    return resources.redis_service
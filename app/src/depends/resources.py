@@ -0,0 +1,160 @@
+import asyncio
+import contextlib
+import logging
+from typing import Awaitable, Callable
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from core.password import PasswordHasher
+from core.pool import InstrumentedAsyncQueuePool
+from core.rate_limit import SlidingWindowLimiter
+from core.settings import SETTINGS, Settings
+from depends.email import email_queue
+from depends.password import password_hasher
+from services.cache import ArticleCacheService
+from services.email_queue import EmailQueue
+from services.rate_limit import RateLimitService
+from services.redis import RedisService
+
+logger = logging.getLogger(__name__)
+
+
+class ResourceManager:
+    """Owns the engine, Redis and SMTP pools of a worker.
+
+    Started and stopped from the application lifespan; `ready` turns on
+    only after the pools have been warmed up, so the readiness probe does
+    not route traffic to a worker that would open connections on demand.
+    """
+
+    def __init__(self,
+                 settings: Settings,
+                 email_queue: EmailQueue,
+                 password_hasher: PasswordHasher,
+                 local_limiter: SlidingWindowLimiter):
+        self._settings: Settings = settings
+        self._email_queue: EmailQueue = email_queue
+        self._password_hasher: PasswordHasher = password_hasher
+        self._local_limiter: SlidingWindowLimiter = local_limiter
+        self.engine: AsyncEngine | None = None
+        self.session_factory: sessionmaker | None = None
+        self.redis_service: RedisService | None = None
+        self.rate_limit_service: RateLimitService | None = None
+        self.article_cache_service: ArticleCacheService | None = None
+        self.ready: bool = False
+
+    def _create_engine(self) -> AsyncEngine:
+        postgres = self._settings.POSTGRES
+        return create_async_engine(
+            postgres.build_url(),
+            poolclass=InstrumentedAsyncQueuePool,
+            pool_size=postgres.POOL_SIZE,
+            max_overflow=postgres.MAX_OVERFLOW,
+            pool_timeout=postgres.POOL_TIMEOUT,
+            pool_pre_ping=postgres.POOL_PRE_PING,
+            pool_recycle=postgres.POOL_RECYCLE,
+            connect_args={
+                'server_settings': postgres.build_server_settings(),
+                'prepared_statement_cache_size': postgres.STATEMENT_CACHE_SIZE,
+            },
+        )
+
+    def _create_redis_service(self) -> RedisService:
+        redis = self._settings.REDIS
+        return RedisService(
+            connect_url=redis.build_url(),
+            max_connections=redis.MAX_CONNECTIONS,
+            socket_timeout=redis.SOCKET_TIMEOUT,
+            socket_connect_timeout=redis.SOCKET_CONNECT_TIMEOUT,
+        )
+
+    async def start(self) -> None:
+        self.engine = self._create_engine()
+        self.session_factory = sessionmaker(bind=self.engine,
+                                            expire_on_commit=False,
+                                            class_=AsyncSession)
+        self.redis_service = self._create_redis_service()
+        # Скрипты регистрируются один раз на воркер, а не на каждый запрос
+        self.rate_limit_service = RateLimitService(redis_service=self.redis_service,
+                                                   local_limiter=self._local_limiter)
+        self.article_cache_service = ArticleCacheService(
+            redis_service=self.redis_service,
+            article_ttl=self._settings.CACHE.ARTICLE_TTL,
+            list_ttl=self._settings.CACHE.ARTICLE_LIST_TTL,
+        )
+        self._email_queue.start()
+
+    async def _warmup_database(self) -> None:
+        # Соединения держатся одновременно, иначе пул раз за разом отдаёт одно и то же
+        count = min(self._settings.POSTGRES.WARMUP_CONNECTIONS,
+                    self._settings.POSTGRES.POOL_SIZE)
+        async with contextlib.AsyncExitStack() as stack:
+            for _ in range(count):
+                connection = await stack.enter_async_context(self.engine.connect())
+                await connection.execute(text('SELECT 1'))
+
+    async def warmup(self) -> None:
+        # Недоступная зависимость не валит воркер: он поднимется неготовым,
+        # а /health/ready будет перепроверять её на каждом запросе
+        # Таймаут короче воркерного у gunicorn: хост, молча теряющий пакеты,
+        # иначе держит старт до таймаута подключения asyncpg (60 с)
+        timeout = self._settings.SERVER.WARMUP_TIMEOUT
+        results = await asyncio.gather(
+            asyncio.wait_for(self._warmup_database(), timeout),
+            asyncio.wait_for(self.redis_service.ping(), timeout),
+            return_exceptions=True,
+        )
+        for name, result in zip(('database', 'redis'), results):
+            if isinstance(result, Exception):
+                logger.warning("Failed to warm up %s: %r", name, result)
+
+    def set_ready(self) -> None:
+        self.ready = True
+
+    async def _check(self, probe: Callable[[], Awaitable]) -> bool:
+        try:
+            await asyncio.wait_for(probe(), self._settings.SERVER.READY_TIMEOUT)
+        except Exception:
+            return False
+        return True
+
+    async def _ping_database(self) -> None:
+        async with self.engine.connect() as connection:
+            await connection.execute(text('SELECT 1'))
+
+    async def check(self) -> dict[str, bool]:
+        if not self.ready:
+            return {'database': False, 'redis': False}
+        database, redis = await asyncio.gather(
+            self._check(self._ping_database),
+            self._check(self.redis_service.ping),
+        )
+        return {'database': database, 'redis': redis}
+
+    async def stop(self) -> None:
+        self.ready = False
+        # Очередь дописывает письма до закрытия остальных пулов
+        await self._email_queue.stop()
+        self._password_hasher.shutdown()
+        self.rate_limit_service = None
+        self.article_cache_service = None
+        if self.redis_service is not None:
+            await self.redis_service.close()
+            self.redis_service = None
+        if self.engine is not None:
+            await self.engine.dispose()
+            self.engine = None
+            self.session_factory = None
+
+
+resources = ResourceManager(settings=SETTINGS,
+                            email_queue=email_queue,
+                            password_hasher=password_hasher,
+                            local_limiter=SlidingWindowLimiter(
+                                maxsize=SETTINGS.RATE_LIMIT.LOCAL_MAXSIZE))
+
+
+def get_resources() -> ResourceManager:
+    return resources
@@ -1,21 +1,50 @@
-from typing import AsyncGenerator
+from typing import AsyncGenerator, Callable, Coroutine
 
-from fastapi import Depends
-from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import Depends, Request, Response
+from fastapi.routing import APIRoute
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
 from sqlalchemy.orm import sessionmaker
 
-session_factory: sessionmaker | None = None
+from depends.resources import resources
+
+
+def get_engine() -> AsyncEngine:
+    if not resources.engine:
+        raise NotImplementedError()
+    return resources.engine
 
 
 def get_session_factory() -> sessionmaker:
-    if not session_factory:
+    if not resources.session_factory:
         raise NotImplementedError()
-    return session_factory
+    return resources.session_factory
 
 
-async def get_session(s_factory=Depends(get_session_factory)) -> AsyncGenerator:
+async def get_session(request: Request,
+                      s_factory=Depends(get_session_factory)) -> AsyncGenerator:
     session: AsyncSession = s_factory()
+    request.state.session = session
     try:
         yield session
     finally:
         await session.close()
+
+
+class UnitOfWorkRoute(APIRoute):
+    """Commits the request session once the handler has returned.
+
+    Yield dependencies are finalized after the response is sent, so the
+    commit happens here to let commit errors still turn into a 500.
+    """
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine[None, None, Response]]:
+        route_handler = super().get_route_handler()
+
+        async def unit_of_work_handler(request: Request) -> Response:
+            response = await route_handler(request)
+            session: AsyncSession | None = getattr(request.state, 'session', None)
+            if session is not None and session.in_transaction():
+                await session.commit()
+            return response
+
+        return unit_of_work_handler
@@ -0,0 +1,20 @@
+from fastapi import Depends
+
+from core.cache import TTLCache
+from core.settings import SETTINGS
+from depends.redis import get_redis_service
+from services.redis import RedisService
+from services.user_cache import UserCacheService
+
+local_user_cache = TTLCache(maxsize=SETTINGS.USER_CACHE.MAXSIZE,
+                            ttl=SETTINGS.USER_CACHE.TTL)
+
+
+def get_user_cache_service(
+        redis_service: RedisService = Depends(get_redis_service)
+) -> UserCacheService:
+    return UserCacheService(
+        local_cache=local_user_cache,
+        redis_service=redis_service if SETTINGS.USER_CACHE.USE_REDIS else None,
+        redis_ttl=SETTINGS.USER_CACHE.REDIS_TTL,
+    )
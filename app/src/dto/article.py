@@ -0,0 +1,16 @@
+from pydantic import BaseModel
+
+
+class ShortCategoryDTO(BaseModel):
+    id: int
+    name: str
+
+
+class ShortArticleDTO(BaseModel):
+    id: int
+    title: str
+    categories: list[ShortCategoryDTO]
+
+
+class FoundArticleDTO(ShortArticleDTO):
+    rank: float
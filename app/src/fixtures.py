@@ -10,7 +10,8 @@ async def load_fixtures(session_factory):
         s.add(test_user)
         await s.flush()
         test_category = CategoryModel(name="Тестовая категория",
-                                      user_id=test_user.id)
+                                      user_id=test_user.id,
+                                      article_count=1)
         s.add(test_category)
         await s.flush()
         test_article = ArticleModel(title="Тестовая статья",
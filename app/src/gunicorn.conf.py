@@ -0,0 +1,8 @@
+from core.settings import SETTINGS
+
+bind = f'{SETTINGS.SERVER.HOST}:{SETTINGS.SERVER.PORT}'
+workers = SETTINGS.SERVER.build_workers(SETTINGS.DEBUG)
+worker_class = 'core.workers.ProductionWorker'
+graceful_timeout = SETTINGS.SERVER.GRACEFUL_TIMEOUT
+keepalive = SETTINGS.SERVER.KEEPALIVE
+accesslog = '-'
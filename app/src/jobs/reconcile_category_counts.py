@@ -0,0 +1,21 @@
+import asyncio
+
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from core.settings import SETTINGS
+from services.database.category import CategoryService
+
+
+async def main() -> None:
+    engine = create_async_engine(SETTINGS.POSTGRES.build_url())
+    session_factory = sessionmaker(bind=engine, expire_on_commit=False,
+                                   class_=AsyncSession)
+    async with session_factory() as session:
+        fixed = await CategoryService(session_or_pool=session).reconcile_article_counts()
+    await engine.dispose()
+    print(f"Reconciled {fixed} categories")
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -1,9 +1,14 @@
+import contextlib
+from typing import AsyncIterator
+
+from alembic import command
+from alembic.config import Config
 from fastapi import FastAPI
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
 
 from core.settings import SETTINGS
-from depends import session
+from depends.resources import resources
 from fixtures import load_fixtures
 from models import *
 from routers import root_router
@@ -16,24 +21,30 @@ app = FastAPI(
 app.include_router(root_router)
 
 
-@app.on_event('startup')
-async def startup():
-    engine = create_async_engine(
-        SETTINGS.POSTGRES.build_url(),
-        connect_args={
-            'server_settings':
-                {
-                    'application_name': "article_api"
-                }
-        },
-    )
-    session.session_factory = sessionmaker(bind=engine,
-                                           expire_on_commit=False,
-                                           class_=AsyncSession)
-
-    if SETTINGS.DEBUG:
-        async with engine.begin() as conn:
-            await conn.run_sync(DatabaseModel.metadata.drop_all)
-            await conn.run_sync(DatabaseModel.metadata.create_all)
-
-        await load_fixtures(session.session_factory)
+def run_migrations(connection: Connection) -> None:
+    config = Config('alembic.ini')
+    config.attributes['connection'] = connection
+    command.upgrade(config, 'head')
+
+
+@contextlib.asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    await resources.start()
+    try:
+        if SETTINGS.DEBUG:
+            async with resources.engine.begin() as conn:
+                await conn.run_sync(DatabaseModel.metadata.drop_all)
+                await conn.execute(text('DROP TABLE IF EXISTS alembic_version'))
+                await conn.run_sync(run_migrations)
+
+            await load_fixtures(resources.session_factory)
+
+        await resources.warmup()
+        resources.set_ready()
+        yield
+    finally:
+        await resources.stop()
+
+
+# В FastAPI 0.87 нет параметра lifespan, контекст вешается на роутер напрямую
+app.router.lifespan_context = lifespan
@@ -0,0 +1,56 @@
+import asyncio
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+
+from core.settings import SETTINGS
+from models import DatabaseModel
+
+config = context.config
+
+if config.config_file_name is not None and \
+        config.attributes.get('connection') is None:
+    fileConfig(config.config_file_name)
+
+target_metadata = DatabaseModel.metadata
+
+
+def run_migrations_offline() -> None:
+    context.configure(url=SETTINGS.POSTGRES.build_url(),
+                      target_metadata=target_metadata,
+                      literal_binds=True,
+                      dialect_opts={"paramstyle": "named"})
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def do_run_migrations(connection: Connection) -> None:
+    context.configure(connection=connection,
+                      target_metadata=target_metadata)
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+async def run_async_migrations() -> None:
+    engine = create_async_engine(SETTINGS.POSTGRES.build_url(),
+                                 poolclass=NullPool)
+    async with engine.connect() as connection:
+        await connection.run_sync(do_run_migrations)
+    await engine.dispose()
+
+
+def run_migrations_online() -> None:
+    connection: Connection | None = config.attributes.get('connection')
+    if connection is not None:
+        do_run_migrations(connection)
+        return
+    asyncio.run(run_async_migrations())
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
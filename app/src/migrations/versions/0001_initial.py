@@ -0,0 +1,71 @@
+"""initial
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'users',
+        sa.Column('id', sa.INT(), autoincrement=True, nullable=False),
+        sa.Column('created_at', sa.TIMESTAMP(), server_default=sa.text('now()'), nullable=True),
+        sa.Column('email', sa.VARCHAR(length=256), nullable=True),
+        sa.Column('password_hash', sa.VARCHAR(length=256), nullable=True),
+        sa.Column('is_verified', sa.BOOLEAN(), server_default='0', nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_users_email', 'users', ['email'], unique=True)
+    op.create_table(
+        'articles',
+        sa.Column('id', sa.INT(), autoincrement=True, nullable=False),
+        sa.Column('created_at', sa.TIMESTAMP(), server_default=sa.text('now()'), nullable=False),
+        sa.Column('edited_at', sa.TIMESTAMP(), server_default=sa.text('now()'), nullable=False),
+        sa.Column('title', sa.VARCHAR(length=32), nullable=False),
+        sa.Column('text', sa.TEXT(), nullable=False),
+        sa.Column('user_id', sa.INT(), nullable=True),
+        sa.Column('search_vector', postgresql.TSVECTOR(),
+                  sa.Computed("to_tsvector('simple', title || ' ' || text)", persisted=True),
+                  nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_articles_search_vector', 'articles', ['search_vector'],
+                    unique=False, postgresql_using='gin')
+    op.create_table(
+        'categories',
+        sa.Column('id', sa.INT(), autoincrement=True, nullable=False),
+        sa.Column('created_at', sa.TIMESTAMP(), server_default=sa.text('now()'), nullable=False),
+        sa.Column('edited_at', sa.TIMESTAMP(), server_default=sa.text('now()'), nullable=False),
+        sa.Column('name', sa.VARCHAR(length=32), nullable=True),
+        sa.Column('user_id', sa.INT(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_table(
+        'category_to_articles',
+        sa.Column('category_id', sa.INT(), nullable=False),
+        sa.Column('article_id', sa.INT(), nullable=False),
+        sa.ForeignKeyConstraint(['article_id'], ['articles.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['category_id'], ['categories.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('category_id', 'article_id'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('category_to_articles')
+    op.drop_table('categories')
+    op.drop_index('ix_articles_search_vector', table_name='articles')
+    op.drop_table('articles')
+    op.drop_index('ix_users_email', table_name='users')
+    op.drop_table('users')
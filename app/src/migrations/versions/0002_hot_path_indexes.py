@@ -0,0 +1,27 @@
+"""hot path indexes
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 12:10:00.000000
+
+"""
+from alembic import op
+
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_articles_user_id', 'articles', ['user_id'])
+    op.create_index('ix_categories_user_id', 'categories', ['user_id'])
+    op.create_index('ix_category_to_articles_article_id',
+                    'category_to_articles', ['article_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_category_to_articles_article_id',
+                  table_name='category_to_articles')
+    op.drop_index('ix_categories_user_id', table_name='categories')
+    op.drop_index('ix_articles_user_id', table_name='articles')
@@ -0,0 +1,29 @@
+"""category article count
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 12:20:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('categories',
+                  sa.Column('article_count', sa.INT(), server_default='0', nullable=False))
+    op.execute(
+        "UPDATE categories SET article_count = counts.article_count "
+        "FROM (SELECT category_id, count(*) AS article_count "
+        "FROM category_to_articles GROUP BY category_id) AS counts "
+        "WHERE categories.id = counts.category_id"
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('categories', 'article_count')
@@ -1,13 +1,18 @@
 import datetime
 
-from sqlalchemy import Column, TIMESTAMP, VARCHAR, func, INT, ForeignKey, TEXT
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, TIMESTAMP, VARCHAR, func, INT, ForeignKey, TEXT, Computed, Index
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import deferred, relationship
 
 from models.base import DatabaseModel
 
 
 class ArticleModel(DatabaseModel):
     __tablename__ = 'articles'
+    __table_args__ = (
+        Index('ix_articles_search_vector', 'search_vector',
+              postgresql_using='gin'),
+    )
 
     id = Column(INT,
                 autoincrement=True,
@@ -25,7 +30,12 @@ class ArticleModel(DatabaseModel):
     user_id = Column(INT,
                      ForeignKey("users.id",
                                 ondelete='CASCADE'),
-                     nullable=True)
+                     nullable=True,
+                     index=True)
+    search_vector = deferred(Column(TSVECTOR,
+                                    Computed("to_tsvector('simple', "
+                                             "title || ' ' || text)",
+                                             persisted=True)))
 
     user = relationship("UserModel",
                         back_populates="articles")
@@ -20,10 +20,14 @@ class CategoryModel(DatabaseModel):
                        onupdate=datetime.datetime.utcnow,
                        nullable=False)
     name = Column(VARCHAR(32))
+    article_count = Column(INT,
+                           server_default='0',
+                           nullable=False)
     user_id = Column(INT,
                      ForeignKey("users.id",
                                 ondelete='CASCADE'),
-                     nullable=True)
+                     nullable=True,
+                     index=True)
 
     user = relationship("UserModel",
                         back_populates="categories")
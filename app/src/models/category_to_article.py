@@ -13,4 +13,5 @@ class CategoryToArticle(DatabaseModel):
     article_id = Column(INT,
                         ForeignKey("articles.id",
                                    ondelete='CASCADE'),
-                        primary_key=True)
+                        primary_key=True,
+                        index=True)
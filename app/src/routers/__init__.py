@@ -1,9 +1,10 @@
 from fastapi import APIRouter
 
-from routers import health
+from routers import health, metrics
 from .v1 import v1_router
 
 root_router = APIRouter(prefix="/api")
 
 root_router.include_router(v1_router)
 root_router.include_router(health.router)
+root_router.include_router(metrics.router)
@@ -1,6 +1,7 @@
-from fastapi import APIRouter, status
+from fastapi import APIRouter, Depends, Response, status
 
-from schemas.health import HealthResponse
+from depends.resources import ResourceManager, get_resources
+from schemas.health import HealthResponse, ReadinessResponse
 
 router = APIRouter()
 
@@ -12,3 +13,20 @@ router = APIRouter()
 )
 async def health():
     return HealthResponse(status="ok")
+
+
+@router.get(
+    path='/health/ready',
+    status_code=status.HTTP_200_OK,
+    response_model=ReadinessResponse,
+    responses={status.HTTP_503_SERVICE_UNAVAILABLE: {'model': ReadinessResponse}}
+)
+async def ready(
+        response: Response,
+        resources: ResourceManager = Depends(get_resources),
+):
+    checks = await resources.check()
+    is_ready = all(checks.values())
+    if not is_ready:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    return ReadinessResponse(status="ok" if is_ready else "unavailable", **checks)
@@ -0,0 +1,30 @@
+from fastapi import APIRouter, Depends, status
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from core.password import PasswordHasher
+from depends.email import get_email_queue
+from depends.metrics import check_metrics_access
+from depends.password import get_password_hasher
+from depends.session import get_engine
+from schemas.metrics import MetricsResponse
+from services.database import base
+from services.email_queue import EmailQueue
+
+router = APIRouter()
+
+
+@router.get(
+    path='/metrics',
+    status_code=status.HTTP_200_OK,
+    response_model=MetricsResponse,
+    dependencies=[Depends(check_metrics_access)]
+)
+async def metrics(
+        password_hasher: PasswordHasher = Depends(get_password_hasher),
+        engine: AsyncEngine = Depends(get_engine),
+        email_queue: EmailQueue = Depends(get_email_queue),
+):
+    return MetricsResponse(password_hasher=password_hasher.get_stats(),
+                           db_pool=engine.sync_engine.pool.get_stats(),
+                           statement_cache=base.statement_cache.get_stats(),
+                           email_queue=email_queue.get_stats())
@@ -1,40 +1,167 @@
-from fastapi import APIRouter, Depends, HTTPException
+import datetime
+import functools
+
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.exc import IntegrityError
 from starlette import status
 
+from core.cursor import CursorError, decode_cursor, encode_cursor
+from core.etag import is_conditional, is_not_modified, make_etag, make_validator_headers
+from core.responses import ORJSONResponse, dumps
 from depends.auth import get_user_from_jwt
+from depends.cache import get_article_cache_service, get_total_count_service
 from depends.db import get_article_service, get_category_service
+from depends.rate_limit import limit_writes
+from depends.session import UnitOfWorkRoute
 from models import ArticleModel, UserModel
-from schemas.v1.article import ShortArticleResponse, ArticleResponse, ArticleCreateResponse, ArticleCreateRequest
+from schemas.v1.article import ShortArticleResponse, ArticleResponse, ArticleCreateResponse, ArticleCreateRequest, \
+    ArticleBulkCreateRequest, ArticleBulkCreateResponse, ArticleBulkPatchRequest, ExportFormat, \
+    FoundArticleResponse
 from schemas.v1.category import ShortCategoryResponse
 from schemas.v1.user import UserShortResponse
+from services.cache import ArticleCacheService
 from services.database.article import ArticleService
+from services.database.base import DEFAULT_LIMIT, EntityAccessDeniedError, EntityNotFoundError
+from services.count import CountMode, TotalCountService
 from services.database.category import CategoryService
+from services.export import to_csv, to_ndjson
 
-router = APIRouter()
+router = APIRouter(route_class=UnitOfWorkRoute)
 
 
 @router.get(
     path='/articles',
     status_code=status.HTTP_200_OK,
-    response_model=list[ShortArticleResponse]
+    response_model=list[ShortArticleResponse],
+    description="Pass `cursor` from the `X-Next-Cursor` response header "
+                "to get the next page. Pass `count` to get the total in "
+                "the `X-Total-Count` header."
 )
 async def get_articles(
         category_id: int | None = None,
         limit: int | None = None,
         offset: int | None = None,
+        cursor: str | None = None,
+        count: CountMode | None = None,
+        article_service: ArticleService = Depends(get_article_service),
+        article_cache_service: ArticleCacheService = Depends(get_article_cache_service),
+        total_count_service: TotalCountService = Depends(get_total_count_service)
+):
+    headers: dict[str, str] = {}
+    if count is not None:
+        total = await total_count_service.count(
+            mode=count,
+            key=f'articles:{category_id or ""}',
+            exact=functools.partial(article_service.count, category_id=category_id),
+            estimate=functools.partial(article_service.estimate_count, category_id=category_id),
+        )
+        headers["X-Total-Count"] = str(total)
+
+    # Ключ с версией берётся до чтения из БД: если запись успеет сменить
+    # версию, устаревшая страница ляжет под уже мёртвый ключ
+    cache_key = await article_cache_service.get_list_key(
+        category_id=category_id, limit=limit, offset=offset, cursor=cursor
+    )
+    cached: dict | None = await article_cache_service.get_list(cache_key)
+    if cached is not None:
+        if cached["next_cursor"]:
+            headers["X-Next-Cursor"] = cached["next_cursor"]
+        return ORJSONResponse(cached["items"], headers=headers)
+
+    after_id: int | None = None
+    if cursor:
+        if offset:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                                detail="Cursor and offset are mutually exclusive")
+        try:
+            after_id = int(decode_cursor(cursor)[0])
+        except (CursorError, TypeError, ValueError):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                                detail="Bad cursor")
+
+    articles = await article_service.get_list(category_id=category_id,
+                                              limit=limit,
+                                              offset=offset,
+                                              after_id=after_id)
+    next_cursor: str | None = None
+    if articles and len(articles) == (limit if limit else DEFAULT_LIMIT):
+        next_cursor = encode_cursor(articles[-1].id)
+        headers["X-Next-Cursor"] = next_cursor
+
+    items = [article.dict() for article in articles]
+    await article_cache_service.set_list(
+        cache_key,
+        dumps({"items": items, "next_cursor": next_cursor})
+    )
+    return ORJSONResponse(items, headers=headers)
+
+
+@router.get(
+    path="/articles/search",
+    status_code=status.HTTP_200_OK,
+    response_model=list[FoundArticleResponse],
+    description="Pass `cursor` from the `X-Next-Cursor` response header "
+                "to get the next page."
+)
+async def search_articles(
+        q: str = Query(min_length=1),
+        category_id: int | None = None,
+        limit: int | None = None,
+        cursor: str | None = None,
         article_service: ArticleService = Depends(get_article_service)
 ):
-    return [ShortArticleResponse(id=article.id,
-                                 title=article.title,
-                                 categories=
-                                 [ShortCategoryResponse(id=category.id,
-                                                        name=category.name)
-                                  for category in article.categories])
-            for article in
-            await article_service.get_list(category_id=category_id,
-                                           limit=limit,
-                                           offset=offset)]
+    after: tuple[float, int] | None = None
+    if cursor:
+        try:
+            after_rank, after_id = decode_cursor(cursor, size=2)
+            after = (float(after_rank), int(after_id))
+        except (CursorError, TypeError, ValueError):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                                detail="Bad cursor")
+
+    articles = await article_service.search(query=q,
+                                            category_id=category_id,
+                                            limit=limit,
+                                            after=after)
+    headers: dict[str, str] = {}
+    if articles and len(articles) == (limit if limit else DEFAULT_LIMIT):
+        headers["X-Next-Cursor"] = encode_cursor(articles[-1].rank,
+                                                 articles[-1].id)
+
+    return ORJSONResponse(articles, headers=headers)
+
+
+@router.get(
+    path="/articles/export",
+    status_code=status.HTTP_200_OK,
+    response_class=StreamingResponse
+)
+async def export_articles(
+        format: ExportFormat = ExportFormat.NDJSON,
+        category_id: int | None = None,
+        since: datetime.datetime | None = None,
+        article_service: ArticleService = Depends(get_article_service)
+):
+    partitions = article_service.stream_export(category_id=category_id,
+                                               since=since)
+    if format == ExportFormat.CSV:
+        return StreamingResponse(to_csv(partitions),
+                                 media_type="text/csv",
+                                 headers={"Content-Disposition":
+                                          'attachment; filename="articles.csv"'})
+    return StreamingResponse(to_ndjson(partitions),
+                             media_type="application/x-ndjson")
+
+
+def _article_validators(article_id: int,
+                        edited_at: datetime.datetime,
+                        categories_edited_at: datetime.datetime | None,
+                        categories_count: int) -> tuple[str, datetime.datetime]:
+    etag = make_etag(article_id, edited_at.isoformat(),
+                     categories_edited_at.isoformat() if categories_edited_at else None,
+                     categories_count)
+    return etag, max(filter(None, (edited_at, categories_edited_at)))
 
 
 @router.get(
@@ -44,56 +171,106 @@ async def get_articles(
 )
 async def get_article(
         article_id: int,
-        article_service: ArticleService = Depends(get_article_service)
+        request: Request,
+        article_service: ArticleService = Depends(get_article_service),
+        article_cache_service: ArticleCacheService = Depends(get_article_cache_service)
 ):
+    cached: dict | None = await article_cache_service.get_article(id=article_id)
+    if cached is not None:
+        etag = cached["etag"]
+        last_modified = datetime.datetime.fromisoformat(cached["last_modified"])
+        headers = make_validator_headers(etag, last_modified)
+        if is_not_modified(request.headers, etag, last_modified):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        return ORJSONResponse(cached["article"], headers=headers)
+
+    if is_conditional(request.headers):
+        version = await article_service.get_version(id=article_id)
+        if not version:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                                detail="Article not found")
+        etag, last_modified = _article_validators(article_id, *version)
+        if is_not_modified(request.headers, etag, last_modified):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED,
+                            headers=make_validator_headers(etag, last_modified))
+
+    # Версии снимаются до чтения самих данных, в том же порядке, в каком
+    # от них зависит запись: статья, её категории, затем содержимое
+    version = await article_cache_service.get_article_version(id=article_id)
+    category_versions = await article_cache_service.get_category_versions(
+        await article_service.get_category_ids(id=article_id)
+    )
     article: ArticleModel | None = await article_service.get_extended_by_id(id=article_id)
     if not article:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
                             detail="Article not found")
-    return ArticleResponse(id=article.id,
-                           created_at=article.created_at,
-                           edited_at=article.edited_at,
-                           title=article.title,
-                           text=article.text,
-                           user=UserShortResponse(
-                               id=article.user.id,
-                               email=article.user.email,
-                           ),
-                           categories=[ShortCategoryResponse(
-                               id=category.id,
-                               name=category.name,
-                           ) for category in article.categories])
+    article_response = ArticleResponse(id=article.id,
+                                       created_at=article.created_at,
+                                       edited_at=article.edited_at,
+                                       title=article.title,
+                                       text=article.text,
+                                       user=UserShortResponse(
+                                           id=article.user.id,
+                                           email=article.user.email,
+                                       ),
+                                       categories=[ShortCategoryResponse(
+                                           id=category.id,
+                                           name=category.name,
+                                       ) for category in article.categories])
+    etag, last_modified = _article_validators(
+        article.id,
+        article.edited_at,
+        max((category.edited_at for category in article.categories), default=None),
+        len(article.categories),
+    )
+    await article_cache_service.set_article(
+        id=article_id,
+        data=dumps({"etag": etag,
+                    "last_modified": last_modified,
+                    "article": article_response}),
+        version=version,
+        category_versions=category_versions
+    )
+    return ORJSONResponse(article_response,
+                          headers=make_validator_headers(etag, last_modified))
 
 
 @router.delete(
     path="/articles/{article_id}",
-    status_code=status.HTTP_204_NO_CONTENT
+    status_code=status.HTTP_204_NO_CONTENT,
+    dependencies=[Depends(limit_writes)]
 )
 async def delete_article(
         article_id: int,
+        background_tasks: BackgroundTasks,
         user: UserModel = Depends(get_user_from_jwt),
-        article_service: ArticleService = Depends(get_article_service)
+        article_service: ArticleService = Depends(get_article_service),
+        article_cache_service: ArticleCacheService = Depends(get_article_cache_service)
 ):
-    article: ArticleModel | None = await article_service.get_extended_by_id(id=article_id)
-    if not article:
+    try:
+        await article_service.delete_owned(id=article_id, user_id=user.id)
+    except EntityNotFoundError:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
                             detail="Article not found")
-    if article.user_id != user.id:
+    except EntityAccessDeniedError:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN,
                             detail="Access denied")
-    await article_service.delete_by_id(article_id)
+    background_tasks.add_task(article_cache_service.invalidate_articles, article_id)
 
 
 @router.post(
     path="/articles",
     status_code=status.HTTP_200_OK,
-    response_model=ArticleCreateResponse
+    response_model=ArticleCreateResponse,
+    dependencies=[Depends(limit_writes)]
 )
 async def post_article(
         data: ArticleCreateRequest,
+        background_tasks: BackgroundTasks,
         user: UserModel = Depends(get_user_from_jwt),
         article_service: ArticleService = Depends(get_article_service),
-        category_service: CategoryService = Depends(get_category_service)
+        category_service: CategoryService = Depends(get_category_service),
+        article_cache_service: ArticleCacheService = Depends(get_article_cache_service)
 ):
     if not (await category_service.exists_list(data.categories)):
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
@@ -103,26 +280,30 @@ async def post_article(
                                                       text=data.text,
                                                       user_id=user.id,
                                                       categories=data.categories)
+    background_tasks.add_task(article_cache_service.invalidate_articles)
 
     return ArticleCreateResponse(id=article.id)
 
 
 @router.patch(
     path="/articles/{article_id}",
-    status_code=status.HTTP_204_NO_CONTENT
+    status_code=status.HTTP_204_NO_CONTENT,
+    dependencies=[Depends(limit_writes)]
 )
 async def patch_article(
         article_id: int,
         data: ArticleCreateRequest,
+        background_tasks: BackgroundTasks,
         user: UserModel = Depends(get_user_from_jwt),
         article_service: ArticleService = Depends(get_article_service),
-        category_service: CategoryService = Depends(get_category_service)
+        category_service: CategoryService = Depends(get_category_service),
+        article_cache_service: ArticleCacheService = Depends(get_article_cache_service)
 ):
-    article: ArticleModel | None = await article_service.get_extended_by_id(id=article_id)
-    if not article:
+    owners = await article_service.get_owners([article_id])
+    if article_id not in owners:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
                             detail="Article not found")
-    if article.user_id != user.id:
+    if owners[article_id] != user.id:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN,
                             detail="Access denied")
 
@@ -135,3 +316,67 @@ async def patch_article(
                                  text=data.text,
                                  user_id=user.id,
                                  categories=data.categories)
+    background_tasks.add_task(article_cache_service.invalidate_articles, article_id)
+
+
+@router.post(
+    path="/articles:bulk",
+    status_code=status.HTTP_200_OK,
+    response_model=ArticleBulkCreateResponse,
+    dependencies=[Depends(limit_writes)]
+)
+async def post_articles_bulk(
+        data: ArticleBulkCreateRequest,
+        background_tasks: BackgroundTasks,
+        user: UserModel = Depends(get_user_from_jwt),
+        article_service: ArticleService = Depends(get_article_service),
+        category_service: CategoryService = Depends(get_category_service),
+        article_cache_service: ArticleCacheService = Depends(get_article_cache_service)
+):
+    category_ids = list({category_id
+                         for article in data.articles
+                         for category_id in article.categories or []})
+    if not (await category_service.exists_list(category_ids)):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                            detail="One from categories not found")
+
+    ids = await article_service.add_many(user_id=user.id,
+                                         articles=[article.dict()
+                                                   for article in data.articles])
+    background_tasks.add_task(article_cache_service.invalidate_articles)
+
+    return ArticleBulkCreateResponse(ids=ids)
+
+
+@router.patch(
+    path="/articles:bulk",
+    status_code=status.HTTP_204_NO_CONTENT,
+    dependencies=[Depends(limit_writes)]
+)
+async def patch_articles_bulk(
+        data: ArticleBulkPatchRequest,
+        background_tasks: BackgroundTasks,
+        user: UserModel = Depends(get_user_from_jwt),
+        article_service: ArticleService = Depends(get_article_service),
+        category_service: CategoryService = Depends(get_category_service),
+        article_cache_service: ArticleCacheService = Depends(get_article_cache_service)
+):
+    ids = [article.id for article in data.articles]
+    owners = await article_service.get_owners(ids)
+    if len(owners) != len(ids):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                            detail="One from articles not found")
+    if any(owner_id != user.id for owner_id in owners.values()):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN,
+                            detail="Access denied")
+
+    category_ids = list({category_id
+                         for article in data.articles
+                         for category_id in article.categories or []})
+    if not (await category_service.exists_list(category_ids)):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                            detail="One from categories not found")
+
+    await article_service.update_many(articles=[article.dict()
+                                                for article in data.articles])
+    background_tasks.add_task(article_cache_service.invalidate_articles, *ids)
@@ -1,30 +1,50 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request, Response
 from starlette import status
 
+from core.etag import is_conditional, is_not_modified, make_etag, make_validator_headers
+from core.responses import ORJSONResponse
+
 from depends.auth import get_user_from_jwt
+from depends.cache import get_article_cache_service, get_total_count_service
 from depends.db import get_category_service
+from depends.rate_limit import limit_writes
+from depends.session import UnitOfWorkRoute
 from models import CategoryModel, UserModel
 from schemas.v1.category import ShortCategoryResponse, CategoryResponse, CategoryCreateRequest, CategoryCreateResponse, \
     CategoryPatchRequest
+from services.cache import ArticleCacheService
+from services.count import CountMode, TotalCountService
+from services.database.base import EntityAccessDeniedError, EntityNotFoundError
 from services.database.category import CategoryService
 
-router = APIRouter()
+router = APIRouter(route_class=UnitOfWorkRoute)
 
 
 @router.get(
     path='/categories',
     status_code=status.HTTP_200_OK,
-    response_model=list[ShortCategoryResponse]
+    response_model=list[ShortCategoryResponse],
+    description="Pass `count` to get the total in the `X-Total-Count` header."
 )
 async def get_categories(
         limit: int | None = None,
         offset: int | None = None,
-        category_service: CategoryService = Depends(get_category_service)
+        count: CountMode | None = None,
+        category_service: CategoryService = Depends(get_category_service),
+        total_count_service: TotalCountService = Depends(get_total_count_service)
 ):
-    return [ShortCategoryResponse(**category.as_dict())
-            for category in
-            await category_service.get_list(limit=limit,
-                                            offset=offset)]
+    headers: dict[str, str] = {}
+    if count is not None:
+        total = await total_count_service.count(mode=count,
+                                                key='categories',
+                                                exact=category_service.count,
+                                                estimate=category_service.estimate_count)
+        headers["X-Total-Count"] = str(total)
+    return ORJSONResponse([{"id": category.id, "name": category.name}
+                           for category in
+                           await category_service.get_list(limit=limit,
+                                                           offset=offset)],
+                          headers=headers)
 
 
 @router.get(
@@ -34,19 +54,35 @@ async def get_categories(
 )
 async def get_category(
         category_id: int,
+        request: Request,
+        response: Response,
         category_service: CategoryService = Depends(get_category_service)
 ):
+    if is_conditional(request.headers):
+        version = await category_service.get_version(id=category_id)
+        if not version:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                                detail="Category not found")
+        edited_at, article_count = version
+        etag = make_etag(category_id, edited_at.isoformat(), article_count)
+        if is_not_modified(request.headers, etag, edited_at):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED,
+                            headers=make_validator_headers(etag, edited_at))
+
     category: CategoryModel | None = await category_service.get_by_id(id=category_id)
     if not category:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
                             detail="Category not found")
+    etag = make_etag(category.id, category.edited_at.isoformat(), category.article_count)
+    response.headers.update(make_validator_headers(etag, category.edited_at))
     return CategoryResponse(**category.as_dict())
 
 
 @router.post(
     path="/categories",
     status_code=status.HTTP_200_OK,
-    response_model=CategoryCreateResponse
+    response_model=CategoryCreateResponse,
+    dependencies=[Depends(limit_writes)]
 )
 async def post_category(
         data: CategoryCreateRequest,
@@ -60,38 +96,47 @@ async def post_category(
 
 @router.delete(
     path="/categories/{category_id}",
-    status_code=status.HTTP_204_NO_CONTENT
+    status_code=status.HTTP_204_NO_CONTENT,
+    dependencies=[Depends(limit_writes)]
 )
 async def delete_category(
         category_id: int,
+        background_tasks: BackgroundTasks,
         user: UserModel = Depends(get_user_from_jwt),
         category_service: CategoryService = Depends(get_category_service),
+        article_cache_service: ArticleCacheService = Depends(get_article_cache_service),
 ):
-    category: CategoryModel | None = await category_service.get_by_id(id=category_id)
-    if not category:
+    try:
+        await category_service.delete_owned(id=category_id, user_id=user.id)
+    except EntityNotFoundError:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
                             detail="Category not found")
-    if category.user_id != user.id:
+    except EntityAccessDeniedError:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN,
-                             detail="Access denied")
-    await category_service.delete_by_id(id=category_id)
+                            detail="Access denied")
+    background_tasks.add_task(article_cache_service.invalidate_categories, category_id)
 
 
 @router.patch(
     path="/categories/{category_id}",
-    status_code=status.HTTP_204_NO_CONTENT
+    status_code=status.HTTP_204_NO_CONTENT,
+    dependencies=[Depends(limit_writes)]
 )
 async def patch_category(
         category_id: int,
         data: CategoryPatchRequest,
+        background_tasks: BackgroundTasks,
         user: UserModel = Depends(get_user_from_jwt),
         category_service: CategoryService = Depends(get_category_service),
+        article_cache_service: ArticleCacheService = Depends(get_article_cache_service),
 ):
-    category: CategoryModel | None = await category_service.get_by_id(id=category_id)
-    if not category:
+    try:
+        await category_service.update_owned(id=category_id, user_id=user.id,
+                                            **data.dict())
+    except EntityNotFoundError:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
                             detail="Category not found")
-    if category.user_id != user.id:
+    except EntityAccessDeniedError:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN,
-                             detail="Access denied")
-    await category_service.update_by_id(id=category_id, **data.dict())
+                            detail="Access denied")
+    background_tasks.add_task(article_cache_service.invalidate_categories, category_id)
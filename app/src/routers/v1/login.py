@@ -1,29 +1,37 @@
 from fastapi import APIRouter, status, Depends, HTTPException
 
 from core.jwt import JWTRepository
+from core.password import PasswordHasher
+from core.settings import SETTINGS
 from depends.jwt import get_jwt_repository
+from depends.password import get_password_hasher
 from dto.token import TokenDTO
 from dto.user import LoginDTO
 from schemas.v1.login import LoginResponse, LoginRequest
 from services.database.user import UserService, UserNotExistsError, UserBadPasswordError, UserNotVerifiedError
 from depends.db import get_user_service
+from depends.rate_limit import rate_limit
+from depends.session import UnitOfWorkRoute
 
-router = APIRouter()
+router = APIRouter(route_class=UnitOfWorkRoute)
 
 
 @router.post(
     path='/login',
     status_code=status.HTTP_200_OK,
-    response_model=LoginResponse
+    response_model=LoginResponse,
+    dependencies=[Depends(rate_limit('login', SETTINGS.RATE_LIMIT.LOGIN))]
 )
 async def login(
         data: LoginRequest,
         jwt_repository: JWTRepository = Depends(get_jwt_repository),
+        password_hasher: PasswordHasher = Depends(get_password_hasher),
         user_service: UserService = Depends(get_user_service)
 ):
     try:
         auth_data: LoginDTO = await user_service.login(
             jwt_repository=jwt_repository,
+            password_hasher=password_hasher,
             email=data.email,
             password=data.password)
     except (UserNotExistsError, UserBadPasswordError):
@@ -1,36 +1,65 @@
 from fastapi import APIRouter, status, Depends, HTTPException
 
+from core.password import PasswordHasher
+from core.settings import SETTINGS
 from depends.db import get_user_service
 from depends.email import get_email_service
+from depends.password import get_password_hasher
+from depends.rate_limit import check_rate_limit, get_rate_limit_service, rate_limit
 from depends.redis import get_redis_service
+from depends.session import UnitOfWorkRoute
 from models import UserModel
 from schemas.v1.signup import SignUpRequest, SignUpResponse
 from services.database.user import UserService
 from services.email import EmailService
+from services.email_queue import EmailQueueFullError
+from services.rate_limit import RateLimitService
 from services.redis import RedisService
 
-router = APIRouter()
+router = APIRouter(route_class=UnitOfWorkRoute)
+
+CODE_TTL = 60
 
 
 @router.post(
     path='/signup',
     status_code=status.HTTP_200_OK,
-    response_model=SignUpResponse
+    response_model=SignUpResponse,
+    dependencies=[Depends(rate_limit('signup', SETTINGS.RATE_LIMIT.SIGNUP))]
 )
 async def signup(
         data: SignUpRequest,
         user_service: UserService = Depends(get_user_service),
         redis_service: RedisService = Depends(get_redis_service),
-        email_service: EmailService = Depends(get_email_service)
+        email_service: EmailService = Depends(get_email_service),
+        password_hasher: PasswordHasher = Depends(get_password_hasher),
+        rate_limit_service: RateLimitService = Depends(get_rate_limit_service),
 ):
     user: UserModel | None = await user_service.get_by_email(email=data.email)
     if user and user.is_verified:
         raise HTTPException(status_code=status.HTTP_409_CONFLICT,
                             detail="Account already exists")
-    code = await redis_service.get(data.email)
-    if code:
-        raise HTTPException(status_code=status.HTTP_429_TOO_MANY_REQUESTS)
-    code = await email_service.send_code_to_email(data.email)
-    await redis_service.set(key=data.email, value=code, expire=60)
-    await user_service.signup(email=data.email, password=data.password)
+    # NX защищает только от повтора в пределах жизни кода, а код сгорает
+    # на каждой попытке verify, поэтому письма на адрес ограничены отдельно
+    await check_rate_limit(rate_limit_service, 'signup_email', data.email,
+                           SETTINGS.RATE_LIMIT.SIGNUP_EMAIL,
+                           window=SETTINGS.RATE_LIMIT.SIGNUP_EMAIL_WINDOW)
+    code = email_service.generate_code()
+    # SET NX и резервирует код, и не даёт отправить письмо повторно
+    if not await redis_service.set(key=data.email, value=code,
+                                   expire=CODE_TTL, nx=True):
+        raise HTTPException(status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                            headers={"Retry-After": str(CODE_TTL)})
+    try:
+        await user_service.signup(password_hasher=password_hasher,
+                                  email=data.email,
+                                  password=data.password)
+        email_service.send_code(email=data.email, code=code)
+    except EmailQueueFullError:
+        await redis_service.remove(data.email)
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                            detail="Try again later")
+    except Exception:
+        await redis_service.remove(data.email)
+        raise
     return SignUpResponse(message="Code sent")
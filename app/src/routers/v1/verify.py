@@ -1,14 +1,19 @@
-from fastapi import APIRouter, status, Depends, HTTPException
+import hmac
+
+from fastapi import APIRouter, BackgroundTasks, status, Depends, HTTPException
 
 from depends.db import get_user_service
 from depends.redis import get_redis_service
+from depends.session import UnitOfWorkRoute
+from depends.user_cache import get_user_cache_service
 from models import UserModel
 from schemas.v1.signup import SignUpRequest
 from schemas.v1.verify import VerifyResponse, VerifyRequest
 from services.database.user import UserService
 from services.redis import RedisService
+from services.user_cache import UserCacheService
 
-router = APIRouter()
+router = APIRouter(route_class=UnitOfWorkRoute)
 
 
 @router.post(
@@ -18,8 +23,10 @@ router = APIRouter()
 )
 async def verify(
         data: VerifyRequest,
+        background_tasks: BackgroundTasks,
         user_service: UserService = Depends(get_user_service),
         redis_service: RedisService = Depends(get_redis_service),
+        user_cache_service: UserCacheService = Depends(get_user_cache_service),
 ):
     user: UserModel | None = await user_service.get_by_email(email=data.email)
     if not user:
@@ -28,10 +35,14 @@ async def verify(
     if user.is_verified:
         raise HTTPException(status_code=status.HTTP_409_CONFLICT,
                             detail="Account already verified")
-    code = await redis_service.get(data.email)
+    # Код одноразовый: GETDEL забирает его атомарно, неверная попытка тоже его сжигает
+    code: bytes | None = await redis_service.getdel(data.email)
     if not code:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
                             detail="Code not found")
-    await redis_service.remove(data.email)
+    if not hmac.compare_digest(code, data.code.encode()):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail="Bad code")
     await user_service.set_verified(email=data.email)
+    background_tasks.add_task(user_cache_service.invalidate, id=user.id)
     return VerifyResponse(message="Ok")
@@ -3,3 +3,9 @@ from pydantic.main import BaseModel
 
 class HealthResponse(BaseModel):
     status: str
+
+
+class ReadinessResponse(BaseModel):
+    status: str
+    database: bool
+    redis: bool
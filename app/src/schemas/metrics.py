@@ -0,0 +1,13 @@
+from pydantic.main import BaseModel
+
+from core.password import PasswordHasherStatsDTO
+from core.pool import PoolStatsDTO
+from core.statement_cache import StatementCacheStatsDTO
+from services.email_queue import EmailQueueStatsDTO
+
+
+class MetricsResponse(BaseModel):
+    password_hasher: PasswordHasherStatsDTO
+    db_pool: PoolStatsDTO
+    statement_cache: StatementCacheStatsDTO
+    email_queue: EmailQueueStatsDTO
@@ -1,10 +1,18 @@
 import datetime
+from enum import Enum
 
-from pydantic import BaseModel, validator, root_validator
+from pydantic import BaseModel, conlist, constr, validator, root_validator
 
 from schemas.v1.category import ShortCategoryResponse
 from schemas.v1.user import UserShortResponse
 
+BULK_MAX_ITEMS = 5000
+
+
+class ExportFormat(str, Enum):
+    NDJSON = 'ndjson'
+    CSV = 'csv'
+
 
 class ShortArticleResponse(BaseModel):
     id: int
@@ -12,6 +20,10 @@ class ShortArticleResponse(BaseModel):
     categories: list[ShortCategoryResponse]
 
 
+class FoundArticleResponse(ShortArticleResponse):
+    rank: float
+
+
 class ArticleResponse(BaseModel):
     id: int
     created_at: datetime.datetime
@@ -42,3 +54,41 @@ class ArticleCreateRequest(BaseModel):
 
 class ArticleCreateResponse(BaseModel):
     id: int
+
+
+class ArticleBulkCreateItem(BaseModel):
+    title: constr(max_length=32)
+    text: str
+    categories: list[int] | None = None
+
+
+class ArticleBulkCreateRequest(BaseModel):
+    # Весь запрос вставляется одной транзакцией, большие импорты шлются частями
+    articles: conlist(ArticleBulkCreateItem, max_items=BULK_MAX_ITEMS)
+
+    @validator('articles')
+    def check_articles(cls, value: list):
+        if not value:
+            raise ValueError("Articles is empty")
+        return value
+
+
+class ArticleBulkCreateResponse(BaseModel):
+    ids: list[int]
+
+
+class ArticlePatchItem(ArticleCreateRequest):
+    id: int
+    title: constr(max_length=32) | None = None
+
+
+class ArticleBulkPatchRequest(BaseModel):
+    articles: conlist(ArticlePatchItem, max_items=BULK_MAX_ITEMS)
+
+    @validator('articles')
+    def check_articles(cls, value: list):
+        if not value:
+            raise ValueError("Articles is empty")
+        if len({article.id for article in value}) != len(value):
+            raise ValueError("Duplicated article id")
+        return value
@@ -11,6 +11,7 @@ class ShortCategoryResponse(BaseModel):
 class CategoryResponse(BaseModel):
     id: int
     name: str
+    article_count: int
     created_at: datetime.datetime
     edited_at: datetime.datetime | None
 
@@ -0,0 +1,145 @@
+from typing import Any, Iterable
+
+import orjson
+from aioredis import RedisError
+
+from services.redis import RedisService
+
+ARTICLE_KEY = 'cache:article:v3:{id}'
+ARTICLE_VERSION_KEY = 'cache:article:version:{id}'
+CATEGORY_VERSION_PREFIX = 'cache:category:version:'
+ARTICLE_LIST_KEY = 'cache:articles:{version}:{params}'
+ARTICLE_LIST_VERSION_KEY = 'cache:articles:version'
+
+# Запись статьи хранит версии статьи и её категорий, снятые до чтения из БД.
+# Запись отдаётся, только если ни одна из версий с тех пор не сдвинулась,
+# поэтому опоздавший SET со старыми данными никогда не будет прочитан.
+# Ключи версий категорий собираются в скрипте: заранее они неизвестны
+GET_ARTICLE_SCRIPT = """
+local entry = redis.call('HMGET', KEYS[1], 'data', 'version', 'categories')
+if not entry[1] then
+    return false
+end
+if entry[2] ~= (redis.call('GET', KEYS[2]) or '0') then
+    return false
+end
+for id, version in string.gmatch(entry[3], '(%d+):(%d+)') do
+    if version ~= (redis.call('GET', ARGV[1] .. id) or '0') then
+        return false
+    end
+end
+return entry[1]
+"""
+
+
+class ArticleCacheService:
+    def __init__(self,
+                 redis_service: RedisService,
+                 article_ttl: int,
+                 list_ttl: int):
+        self._redis_service: RedisService = redis_service
+        self._article_ttl: int = article_ttl
+        self._list_ttl: int = list_ttl
+        # Версии живут дольше записей, которые на них ссылаются
+        self._version_ttl: int = article_ttl * 2
+        self._get_article_script = redis_service.register_script(GET_ARTICLE_SCRIPT)
+
+    async def _get(self, key: str) -> Any | None:
+        try:
+            value = await self._redis_service.get(key)
+        except RedisError:
+            return None
+        return orjson.loads(value) if value is not None else None
+
+    async def _set(self, key: str, value: bytes, expire: int) -> None:
+        try:
+            await self._redis_service.set(key=key, value=value, expire=expire)
+        except RedisError:
+            pass
+
+    async def get_article(self, id: int) -> dict | None:
+        try:
+            value = await self._get_article_script(
+                keys=[ARTICLE_KEY.format(id=id), ARTICLE_VERSION_KEY.format(id=id)],
+                args=[CATEGORY_VERSION_PREFIX],
+            )
+        except RedisError:
+            return None
+        return orjson.loads(value) if value is not None else None
+
+    async def get_article_version(self, id: int) -> int | None:
+        """Must be read before the article itself is read from the database."""
+        try:
+            version = await self._redis_service.get(ARTICLE_VERSION_KEY.format(id=id))
+        except RedisError:
+            return None
+        return int(version or 0)
+
+    async def get_category_versions(self, ids: Iterable[int]) -> dict[int, int] | None:
+        """Must be read before the categories themselves are read from the database."""
+        ids = list(ids)
+        if not ids:
+            return {}
+        try:
+            versions = await self._redis_service.mget(
+                *(f'{CATEGORY_VERSION_PREFIX}{id}' for id in ids)
+            )
+        except RedisError:
+            return None
+        return {id: int(version or 0) for id, version in zip(ids, versions)}
+
+    async def set_article(self, id: int, data: bytes, version: int | None,
+                          category_versions: dict[int, int] | None) -> None:
+        if version is None or category_versions is None:
+            return
+        key = ARTICLE_KEY.format(id=id)
+        try:
+            async with self._redis_service.pipeline() as pipe:
+                pipe.hset(key, mapping={
+                    'data': data,
+                    'version': version,
+                    'categories': ','.join(f'{category_id}:{category_version}'
+                                           for category_id, category_version
+                                           in category_versions.items()),
+                })
+                pipe.expire(key, self._article_ttl)
+                await pipe.execute()
+        except RedisError:
+            pass
+
+    async def get_list_key(self, **params: Any) -> str | None:
+        """Must be resolved before the page is read from the database."""
+        try:
+            version = await self._redis_service.get(ARTICLE_LIST_VERSION_KEY)
+        except RedisError:
+            return None
+        formatted_params = '&'.join(f'{k}={v}' for k, v in sorted(params.items()))
+        return ARTICLE_LIST_KEY.format(version=int(version or 0),
+                                       params=formatted_params)
+
+    async def get_list(self, key: str | None) -> dict | None:
+        if key is None:
+            return None
+        return await self._get(key)
+
+    async def set_list(self, key: str | None, data: bytes) -> None:
+        if key is None:
+            return
+        await self._set(key, data, self._list_ttl)
+
+    async def _bump(self, *keys: str) -> None:
+        try:
+            async with self._redis_service.pipeline() as pipe:
+                for key in keys:
+                    pipe.incr(key)
+                    pipe.expire(key, self._version_ttl)
+                pipe.incr(ARTICLE_LIST_VERSION_KEY)
+                await pipe.execute()
+        except RedisError:
+            pass
+
+    async def invalidate_articles(self, *ids: int) -> None:
+        await self._bump(*(ARTICLE_VERSION_KEY.format(id=id) for id in ids))
+
+    async def invalidate_categories(self, *ids: int) -> None:
+        await self._bump(*(f'{CATEGORY_VERSION_PREFIX}{id}' for id in ids))
@@ -0,0 +1,45 @@
+from enum import Enum
+from typing import Awaitable, Callable
+
+from aioredis import RedisError
+
+from services.redis import RedisService
+
+COUNT_KEY = 'cache:count:{key}'
+
+
+class CountMode(str, Enum):
+    EXACT = 'exact'
+    ESTIMATE = 'estimate'
+    CACHED = 'cached'
+
+
+class TotalCountService:
+    def __init__(self, redis_service: RedisService, ttl: int):
+        self._redis_service: RedisService = redis_service
+        self._ttl: int = ttl
+
+    async def count(self,
+                    mode: CountMode,
+                    key: str,
+                    exact: Callable[[], Awaitable[int]],
+                    estimate: Callable[[], Awaitable[int]]) -> int:
+        if mode == CountMode.EXACT:
+            return await exact()
+        if mode == CountMode.ESTIMATE:
+            return await estimate()
+
+        cache_key = COUNT_KEY.format(key=key)
+        try:
+            cached = await self._redis_service.get(cache_key)
+        except RedisError:
+            cached = None
+        if cached is not None:
+            return int(cached)
+        total = await exact()
+        try:
+            await self._redis_service.set(key=cache_key, value=str(total),
+                                          expire=self._ttl)
+        except RedisError:
+            pass
+        return total
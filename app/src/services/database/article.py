@@ -1,10 +1,17 @@
-from typing import cast
+import datetime
+from collections import Counter
+from typing import AsyncIterator, Sequence, cast
 
-from sqlalchemy import select, delete, update
-from sqlalchemy.orm import joinedload
+from sqlalchemy import INT, REAL, bindparam, cast as sql_cast, column, func, literal_column, select, delete, \
+    insert, tuple_, update, values as sql_values
+from sqlalchemy.engine import Row
 
-from models import ArticleModel, CategoryToArticle
-from services.database.base import DatabaseService, make_proxy_bulk_save_func
+from dto.article import FoundArticleDTO, ShortArticleDTO, ShortCategoryDTO
+from models import ArticleModel, CategoryModel, CategoryToArticle
+from services.database.base import BULK_BATCH_SIZE, EXPORT_CHUNK_SIZE, DEFAULT_LIMIT, DatabaseService, chunked
+
+
+SEARCH_CONFIG = literal_column("'simple'::regconfig")
 
 
 class ArticleService(DatabaseService):
@@ -12,59 +19,300 @@ class ArticleService(DatabaseService):
 
     async def get_list(self, category_id: int | None = None,
                        limit: int | None = None,
-                       offset: int | None = None):
-
-        statement = select(self.model)
+                       offset: int | None = None,
+                       after_id: int | None = None) -> list[ShortArticleDTO]:
         if category_id:
-            statement = statement.join(CategoryToArticle,
-                                       CategoryToArticle.article_id == ArticleModel.id). \
-                where(CategoryToArticle.category_id == category_id)
-        statement = statement.limit(limit if limit else 50)
-        statement = statement.offset(offset if offset else 0)
-        statement = statement.options(joinedload(ArticleModel.categories))
+            rows = await self._get_page_by_category(category_id=category_id,
+                                                    limit=limit,
+                                                    offset=offset,
+                                                    after_id=after_id)
+        else:
+            clauses = [ArticleModel.id < after_id] if after_id is not None else []
+            rows = await self._get_all(*clauses,
+                                       columns=[ArticleModel.id, ArticleModel.title],
+                                       order_by=[ArticleModel.id.desc()],
+                                       limit=limit if limit else DEFAULT_LIMIT,
+                                       offset=offset)
+        if not rows:
+            return []
+
+        async with self._transaction:
+            categories = await self._load_short_categories([row.id for row in rows])
+        return [ShortArticleDTO(id=row.id,
+                                title=row.title,
+                                categories=categories.get(row.id, []))
+                for row in rows]
+
+    async def count(self, category_id: int | None = None) -> int:
+        return await self._count(*self._category_clauses(category_id))
+
+    async def estimate_count(self, category_id: int | None = None) -> int:
+        return await self._estimate_count(*self._category_clauses(category_id))
+
+    @staticmethod
+    def _category_clauses(category_id: int | None) -> list:
+        if not category_id:
+            return []
+        return [ArticleModel.id.in_(select(CategoryToArticle.article_id).
+                                    where(CategoryToArticle.category_id == category_id))]
+
+    async def _get_page_by_category(self, category_id: int,
+                                    limit: int | None = None,
+                                    offset: int | None = None,
+                                    after_id: int | None = None) -> list[Row]:
+        # Идём по первичному ключу (category_id, article_id) таблицы связей,
+        # статьи подтягиваются по PK только для строк страницы
+        clauses = [CategoryToArticle.category_id == category_id,
+                   ArticleModel.id == CategoryToArticle.article_id]
+        if after_id is not None:
+            clauses.append(CategoryToArticle.article_id < after_id)
+        return await self._get_all(*clauses,
+                                   columns=[ArticleModel.id, ArticleModel.title],
+                                   order_by=[CategoryToArticle.article_id.desc()],
+                                   limit=limit if limit else DEFAULT_LIMIT,
+                                   offset=offset)
+
+    async def search(self, query: str,
+                     category_id: int | None = None,
+                     limit: int | None = None,
+                     after: tuple[float, int] | None = None) -> list[FoundArticleDTO]:
+        ts_query = func.websearch_to_tsquery(SEARCH_CONFIG, query)
+        rank = func.ts_rank(ArticleModel.search_vector, ts_query)
+        clauses = [ArticleModel.search_vector.op('@@')(ts_query),
+                   *self._category_clauses(category_id)]
+        if after is not None:
+            after_rank, after_id = after
+            clauses.append(tuple_(rank, ArticleModel.id) <
+                           tuple_(sql_cast(after_rank, REAL), after_id))
+        rows = await self._get_all(*clauses,
+                                   columns=[ArticleModel.id,
+                                            ArticleModel.title,
+                                            rank.label('rank')],
+                                   order_by=[rank.desc(), ArticleModel.id.desc()],
+                                   limit=limit if limit else DEFAULT_LIMIT)
+        if not rows:
+            return []
 
         async with self._transaction:
-            scalars = (await self._session.execute(statement)).scalars().unique().all()
-        return cast(list[ArticleModel], scalars)
+            categories = await self._load_short_categories([row.id for row in rows])
+        return [FoundArticleDTO(id=row.id,
+                                title=row.title,
+                                rank=row.rank,
+                                categories=categories.get(row.id, []))
+                for row in rows]
+
+    async def _load_short_categories(
+            self, article_ids: list[int]
+    ) -> dict[int, list[ShortCategoryDTO]]:
+        if not article_ids:
+            return {}
+        statement = select(CategoryToArticle.article_id,
+                           CategoryModel.id,
+                           CategoryModel.name). \
+            join(CategoryModel, CategoryModel.id == CategoryToArticle.category_id). \
+            where(CategoryToArticle.article_id.in_(article_ids)). \
+            order_by(CategoryToArticle.article_id, CategoryModel.id)
+        categories: dict[int, list[ShortCategoryDTO]] = {}
+        for article_id, category_id, name in await self._session.execute(statement):
+            categories.setdefault(article_id, []).append(
+                ShortCategoryDTO(id=category_id, name=name)
+            )
+        return categories
 
     async def get_by_id(self, id: int) -> ArticleModel:
         return await self._get_one(ArticleModel.id == id)
 
+    async def get_version(self, id: int) -> Row | None:
+        statement = select(ArticleModel.edited_at,
+                           func.max(CategoryModel.edited_at).label('categories_edited_at'),
+                           func.count(CategoryModel.id).label('categories_count')). \
+            outerjoin(CategoryToArticle, CategoryToArticle.article_id == ArticleModel.id). \
+            outerjoin(CategoryModel, CategoryModel.id == CategoryToArticle.category_id). \
+            where(ArticleModel.id == id). \
+            group_by(ArticleModel.id)
+        async with self._transaction:
+            return (await self._session.execute(statement)).first()
+
     async def get_extended_by_id(self, id: int) -> ArticleModel:
         return await self._get_one(ArticleModel.id == id,
                                    loads=[ArticleModel.categories,
                                           ArticleModel.user])
 
-    async def add(self, user_id: int, categories: list[int],
+    async def add(self, user_id: int, categories: list[int] | None,
                   **kwargs) -> ArticleModel:
         async with self._transaction:
             article = self.model(user_id=user_id, **kwargs)
             self._session.add(article)
             await self._session.flush()
-            categories_to_article = [CategoryToArticle(category_id=category_id,
-                                                       article_id=article.id)
-                                     for category_id in categories]
-            bulk_save_func = make_proxy_bulk_save_func(instances=categories_to_article)
-            await self._session.run_sync(bulk_save_func)
+            added = await self._insert_links({article.id: categories})
+            await self._shift_article_counts(added)
         return article
 
-    async def update(self, id, categories: list[int],
+    async def update(self, id, categories: list[int] | None,
                      **kwargs):
         async with self._transaction:
             kwargs = {k: v for k, v in kwargs.items() if v is not None}
-            await self._session.execute(update(self.model).where(ArticleModel.id == id).
-                                        values(**kwargs))
             if categories:
-                await self._session.execute(delete(CategoryToArticle).
-                                            where(CategoryToArticle.article_id == id))
-                categories_to_article = [CategoryToArticle(category_id=category_id,
-                                                           article_id=id)
-                                         for category_id in categories]
-                bulk_save_func = make_proxy_bulk_save_func(instances=categories_to_article)
-                await self._session.run_sync(bulk_save_func)
+                kwargs['edited_at'] = datetime.datetime.utcnow()
+            if kwargs:
+                await self._session.execute(update(self.model).where(ArticleModel.id == id).
+                                            values(**kwargs))
+            if categories:
+                removed = await self._delete_links([id])
+                added = await self._insert_links({id: categories})
+                added.subtract(removed)
+                await self._shift_article_counts(added)
+
+    async def add_many(self, user_id: int, articles: list[dict]) -> list[int]:
+        ids: list[int] = []
+        async with self._transaction:
+            for batch in chunked(articles, BULK_BATCH_SIZE):
+                # Порядок строк RETURNING не гарантирован, поэтому id берутся
+                # из последовательности заранее и вставляются явно
+                batch_ids = (await self._session.execute(
+                    select(func.nextval(func.pg_get_serial_sequence(
+                        ArticleModel.__tablename__, 'id'))).
+                    select_from(func.generate_series(1, len(batch)))
+                )).scalars().all()
+                await self._session.execute(
+                    insert(ArticleModel).
+                    values([dict(id=id,
+                                 title=article["title"],
+                                 text=article["text"],
+                                 user_id=user_id)
+                            for id, article in zip(batch_ids, batch)])
+                )
+                ids.extend(batch_ids)
+            added = await self._insert_links({id: article["categories"]
+                                              for id, article in zip(ids, articles)})
+            await self._shift_article_counts(added)
+        return ids
+
+    async def update_many(self, articles: list[dict]) -> None:
+        articles_by_fields: dict[tuple[str, ...], list[dict]] = {}
+        for article in articles:
+            fields = tuple(field for field in ("title", "text")
+                           if article.get(field) is not None)
+            if fields or article.get("categories"):
+                articles_by_fields.setdefault(fields, []).append(article)
+
+        table = ArticleModel.__table__
+        edited_at = datetime.datetime.utcnow()
+        async with self._transaction:
+            for fields, group in articles_by_fields.items():
+                statement = update(table). \
+                    where(table.c.id == bindparam("_id")). \
+                    values({**{field: bindparam(f"_{field}") for field in fields},
+                            "edited_at": edited_at})
+                for batch in chunked(group, BULK_BATCH_SIZE):
+                    await self._session.execute(
+                        statement,
+                        [{"_id": article["id"],
+                          **{f"_{field}": article[field] for field in fields}}
+                         for article in batch]
+                    )
+
+            links = {article["id"]: article["categories"]
+                     for article in articles if article.get("categories")}
+            removed = await self._delete_links(list(links))
+            added = await self._insert_links(links)
+            added.subtract(removed)
+            await self._shift_article_counts(added)
+
+    async def _insert_links(self, categories_by_article: dict[int, list[int] | None]) -> Counter:
+        links = [dict(category_id=category_id, article_id=article_id)
+                 for article_id, categories in categories_by_article.items()
+                 for category_id in dict.fromkeys(categories or [])]
+        for batch in chunked(links, BULK_BATCH_SIZE * 5):
+            await self._session.execute(insert(CategoryToArticle).values(batch))
+        return Counter(link["category_id"] for link in links)
+
+    async def _delete_links(self, article_ids: list[int]) -> Counter:
+        removed: Counter = Counter()
+        for batch in chunked(article_ids, BULK_BATCH_SIZE):
+            statement = delete(CategoryToArticle). \
+                where(CategoryToArticle.article_id.in_(batch)). \
+                returning(CategoryToArticle.category_id)
+            removed.update((await self._session.execute(statement)).scalars().all())
+        return removed
+
+    async def _shift_article_counts(self, deltas: Counter) -> None:
+        deltas = {category_id: delta for category_id, delta in deltas.items() if delta}
+        if not deltas:
+            return
+        # Строки блокируются по возрастанию id, иначе параллельные массовые
+        # запросы с пересекающимися категориями могут взаимно заблокироваться
+        await self._session.execute(
+            select(CategoryModel.id).
+            where(CategoryModel.id.in_(sorted(deltas))).
+            order_by(CategoryModel.id).
+            with_for_update()
+        )
+        shifts = sql_values(column('id', INT), column('delta', INT), name='shifts'). \
+            data(sorted(deltas.items()))
+        await self._session.execute(
+            update(CategoryModel).
+            where(CategoryModel.id == shifts.c.id).
+            values(article_count=CategoryModel.article_count + shifts.c.delta,
+                   edited_at=CategoryModel.edited_at).
+            execution_options(synchronize_session=False)
+        )
+
+    async def get_owners(self, ids: list[int]) -> dict[int, int | None]:
+        owners: dict[int, int | None] = {}
+        # asyncpg ограничивает число параметров запроса 32767
+        for batch in chunked(ids, BULK_BATCH_SIZE):
+            rows = await self._get_all(ArticleModel.id.in_(batch),
+                                       columns=[ArticleModel.id, ArticleModel.user_id])
+            owners.update((row.id, row.user_id) for row in rows)
+        return owners
 
     async def delete_by_id(self, id: int) -> None:
-        await self._delete(ArticleModel.id == id)
+        async with self._transaction:
+            removed = await self._delete_links([id])
+            await self._session.execute(delete(ArticleModel).where(ArticleModel.id == id))
+            await self._shift_article_counts(Counter({category_id: -count
+                                                      for category_id, count in removed.items()}))
+
+    async def delete_owned(self, id: int, user_id: int) -> None:
+        async with self._transaction:
+            category_ids = await self._delete_owned(id, user_id,
+                                                    links=(CategoryToArticle.article_id,
+                                                           CategoryToArticle.category_id))
+            await self._shift_article_counts(Counter({category_id: -1
+                                                      for category_id in category_ids}))
 
     async def update_by_id(self, id: int, **kwargs):
         await self._update(ArticleModel.id == id, **kwargs)
+
+    async def get_category_ids(self, id: int) -> list[int]:
+        statement = select(CategoryToArticle.category_id). \
+            where(CategoryToArticle.article_id == id)
+        async with self._transaction:
+            scalars = (await self._session.execute(statement)).scalars().all()
+        return cast(list[int], scalars)
+
+    async def stream_export(self, category_id: int | None = None,
+                            since: datetime.datetime | None = None
+                            ) -> AsyncIterator[Sequence[Row]]:
+        statement = select(ArticleModel.id,
+                           ArticleModel.created_at,
+                           ArticleModel.edited_at,
+                           ArticleModel.title,
+                           ArticleModel.text,
+                           ArticleModel.user_id,
+                           func.array_remove(func.array_agg(CategoryToArticle.category_id),
+                                             None).label('categories')). \
+            outerjoin(CategoryToArticle, CategoryToArticle.article_id == ArticleModel.id). \
+            group_by(ArticleModel.id). \
+            order_by(ArticleModel.id)
+        statement = statement.where(*self._category_clauses(category_id))
+        if since:
+            statement = statement.where(ArticleModel.edited_at >= since)
+
+        async with self._transaction:
+            result = await self._session.stream(
+                statement.execution_options(yield_per=EXPORT_CHUNK_SIZE)
+            )
+            async for rows in result.partitions(EXPORT_CHUNK_SIZE):
+                yield rows
@@ -1,29 +1,54 @@
 import contextlib
 import enum
+import json
 import sys
-from typing import Any, Callable, Generic, Sequence, Type, TypeVar, Union, cast
+from typing import Any, Callable, Generic, Hashable, Iterator, NoReturn, Sequence, Type, TypeVar, Union, cast
 
+from core.statement_cache import StatementCache
 from models.base import DatabaseModel
-from sqlalchemy import delete, exists, func, select, update
+from sqlalchemy import Column, bindparam, delete, exists, func, select, text, true, update
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.engine import Row
 from sqlalchemy.ext.asyncio import (AsyncResult, AsyncSession,
                                     AsyncSessionTransaction)
-from sqlalchemy.orm import Session, joinedload, sessionmaker
-from sqlalchemy.sql import ClauseElement
-from sqlalchemy.sql.elements import BinaryExpression
+from sqlalchemy.orm import QueryableAttribute, Session, joinedload, sessionmaker
+from sqlalchemy.orm.attributes import instance_state, set_committed_value
+from sqlalchemy.sql import ClauseElement, operators
+from sqlalchemy.sql.elements import BinaryExpression, BindParameter, UnaryExpression
 
 ASTERISK = '*'
+DEFAULT_LIMIT = 50
+BULK_BATCH_SIZE = 1000
+EXPORT_CHUNK_SIZE = 500
+STATEMENT_CACHE_SIZE = 512
 
 SQLAlchemyModel = TypeVar('SQLAlchemyModel', bound=DatabaseModel)
 ExpressionType = Union[BinaryExpression, ClauseElement, bool]
 
 
+class EntityNotFoundError(Exception):
+    pass
+
+
+class EntityAccessDeniedError(Exception):
+    pass
+
+
 class TransactionStrategy(enum.IntEnum):
     ONE_PER_REQUEST = 1
     KEEP_ALIVE = 2
+    UNIT_OF_WORK = 3
 
 
 DEFAULT_STRATEGY = TransactionStrategy.ONE_PER_REQUEST
 
+UNIT_OF_WORK_TRANSACTION = 'unit_of_work_transaction'
+
+# Шаблоны запросов с bindparam вместо значений: одна и та же конструкция
+# переиспользуется, поэтому SQLAlchemy берёт её из compiled cache без
+# пересборки ключа, а asyncpg получает тот же SQL для prepared statements
+statement_cache = StatementCache(maxsize=STATEMENT_CACHE_SIZE)
+
 
 class Transaction:
     def __init__(self, session: AsyncSession, strategy: TransactionStrategy):
@@ -31,7 +56,23 @@ class Transaction:
         self._strategy = strategy
         self._current_txn: AsyncSessionTransaction | None = None
 
+    @property
+    def strategy(self) -> TransactionStrategy:
+        return self._strategy
+
     async def __aenter__(self) -> AsyncSessionTransaction:
+        if self._strategy == TransactionStrategy.UNIT_OF_WORK:
+            # Транзакция общая для всех сервисов сессии, коммитит её
+            # UnitOfWorkRoute после обработчика
+            if not self._session.in_transaction():
+                transaction = self._session.begin()
+                await transaction.start()
+                # AsyncSession находит прокси транзакции только по weakref,
+                # без сильной ссылки get_transaction() падает
+                self._session.info[UNIT_OF_WORK_TRANSACTION] = transaction
+            return cast(AsyncSessionTransaction,
+                        self._session.info.get(UNIT_OF_WORK_TRANSACTION)
+                        or self._session.get_transaction())
         if self._current_txn is not None and \
                 self._strategy == TransactionStrategy.KEEP_ALIVE:
             return self._current_txn
@@ -40,6 +81,12 @@ class Transaction:
         return self._current_txn
 
     async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        if self._strategy == TransactionStrategy.UNIT_OF_WORK:
+            if exc_type is not None:
+                await self._session.rollback()
+            else:
+                await self._session.flush()
+            return None
         if exc_type is not None or exc_val is not None or exc_tb is not None:
             return await self._current_txn.__aexit__(exc_type, exc_val, exc_tb)
         if self._strategy == TransactionStrategy.KEEP_ALIVE:
@@ -61,16 +108,21 @@ class DatabaseService(Generic[SQLAlchemyModel]):  # noqa: WPS214
             session_or_pool: Union[sessionmaker, AsyncSession],
             *,
             query_model: Type[SQLAlchemyModel] = None,
+            strategy: TransactionStrategy = DEFAULT_STRATEGY,
     ) -> None:
         if isinstance(session_or_pool, sessionmaker):
             self._session: AsyncSession = cast(AsyncSession, session_or_pool())
         else:
             self._session = session_or_pool
         self.model = query_model or self.model
-        self._transaction = Transaction(self._session, DEFAULT_STRATEGY)
+        self._transaction = Transaction(self._session, strategy)
 
     @contextlib.asynccontextmanager
     async def transaction(self) -> AsyncSessionTransaction:
+        if self._transaction.strategy == TransactionStrategy.UNIT_OF_WORK:
+            async with self._transaction as transaction:
+                yield transaction
+            return
         self._transaction.change_strategy(TransactionStrategy.KEEP_ALIVE)
         try:
             yield await self._transaction.__aenter__()  # noqa: WPS609
@@ -92,23 +144,84 @@ class DatabaseService(Generic[SQLAlchemyModel]):  # noqa: WPS214
             bulk_save_func = make_proxy_bulk_save_func(instances=models)
             await self._session.run_sync(bulk_save_func)
 
-    async def _get_all(
+    def _cached_statement(self,
+                          key: Hashable | None,
+                          build: Callable[[], Any]) -> Any | None:
+        if key is None:
+            statement_cache.bypass()
+            return None
+        statement = statement_cache.get(key)
+        if statement is None:
+            statement = build()
+            statement_cache.set(key, statement)
+        return statement
+
+    def _select(
             self,
-            *clauses: ExpressionType,
+            clauses: Sequence[ExpressionType],
             load: Any | None = None,
-            limit: int | None = None,
-            offset: int | None = None
-    ) -> list[SQLAlchemyModel]:
-        statement = select(self.model).where(*clauses)
-        if limit:
+            loads: Sequence[Any] | None = None,
+            columns: Sequence[Any] | None = None,
+            order_by: Sequence[Any] | None = None,
+            limit: Any | None = None,
+            offset: Any | None = None
+    ) -> Any:
+        statement = select(*columns) if columns else select(self.model)
+        statement = statement.where(*clauses)
+        if order_by:
+            statement = statement.order_by(*order_by)
+        if limit is not None:
             statement = statement.limit(limit)
-        if offset:
+        if offset is not None:
             statement = statement.offset(offset)
         if load is not None:
             statement = statement.options(joinedload(load))
+        for relationship in loads or ():
+            statement = statement.options(joinedload(relationship))
+        return statement
+
+    async def _get_all(
+            self,
+            *clauses: ExpressionType,
+            load: Any | None = None,
+            columns: Sequence[Any] | None = None,
+            order_by: Sequence[Any] | None = None,
+            limit: int | None = None,
+            offset: int | None = None
+    ) -> list[SQLAlchemyModel] | list[Row]:
+        key = _statement_key('all', self.model, clauses,
+                             load=_shapes([load] if load is not None else None),
+                             columns=_shapes(columns),
+                             order_by=_shapes(order_by, _order_shape),
+                             limit=bool(limit),
+                             offset=bool(offset))
+        statement = self._cached_statement(key, lambda: self._select(
+            _parametrize(clauses),
+            load=load,
+            columns=columns,
+            order_by=order_by,
+            limit=bindparam('p_limit') if limit else None,
+            offset=bindparam('p_offset') if offset else None,
+        ))
+        params = None
+        if statement is not None:
+            params = _clause_params(clauses)
+            if limit:
+                params['p_limit'] = limit
+            if offset:
+                params['p_offset'] = offset
+        else:
+            statement = self._select(clauses,
+                                     load=load,
+                                     columns=columns,
+                                     order_by=order_by,
+                                     limit=limit or None,
+                                     offset=offset or None)
         async with self._transaction:
             session_result: AsyncResult = \
-                await self._session.execute(statement)
+                await self._session.execute(statement, params)
+            if columns:
+                return cast(list[Row], session_result.all())
             scalars = session_result.scalars().unique().all()
         return cast(list[SQLAlchemyModel], scalars)
 
@@ -117,31 +230,92 @@ class DatabaseService(Generic[SQLAlchemyModel]):  # noqa: WPS214
             *clauses: ExpressionType,
             load: Any | None = None,
             loads: Any | None = None,
-    ) -> SQLAlchemyModel | None:
-        statement = select(self.model).where(*clauses)
-        if load is not None:
-            statement = statement.options(joinedload(load))
-        if loads is not None:
-            for _ in loads:
-                statement = statement.options(joinedload(_))
+            columns: Sequence[Any] | None = None,
+    ) -> SQLAlchemyModel | Row | None:
+        key = _statement_key('one', self.model, clauses,
+                             load=_shapes([load] if load is not None else None),
+                             loads=_shapes(loads),
+                             columns=_shapes(columns))
+        statement = self._cached_statement(key, lambda: self._select(
+            _parametrize(clauses), load=load, loads=loads, columns=columns
+        ))
+        params = None
+        if statement is not None:
+            params = _clause_params(clauses)
+        else:
+            statement = self._select(clauses, load=load, loads=loads, columns=columns)
 
         async with self._transaction:
             session_result: AsyncResult = \
-                await self._session.execute(statement)
+                await self._session.execute(statement, params)
+            if columns:
+                return session_result.first()
             first_scalar_result = session_result.scalars().first()
         return first_scalar_result  # type: ignore
 
+    def _build_update(self,
+                      clauses: Sequence[ExpressionType],
+                      values: dict[str, Any]) -> tuple[Any, list[str]]:
+        mapper = self.model.__mapper__
+        attribute_keys = [mapper.get_property_by_column(clause.left).key
+                          for clause in clauses]
+        statement = update(self.model). \
+            where(*_parametrize(clauses)). \
+            values(**{key: bindparam(f'value_{key}') for key in values}). \
+            execution_options(synchronize_session=False)
+        return statement, attribute_keys
+
+    def _synchronize_updated(self,
+                             clauses: Sequence[ExpressionType],
+                             attribute_keys: Sequence[str],
+                             values: dict[str, Any]) -> None:
+        # Шаблон выполняется без synchronize_session: evaluate не видит
+        # параметры выполнения, поэтому загруженные объекты обновляем сами
+        conditions = [(key, clause.operator, clause.right.effective_value)
+                      for key, clause in zip(attribute_keys, clauses)]
+        for instance in list(self._session.sync_session.identity_map.values()):
+            if not isinstance(instance, self.model):
+                continue
+            loaded = instance_state(instance).dict
+            if all(key in loaded and _matches(loaded[key], operator, value)
+                   for key, operator, value in conditions):
+                for key, value in values.items():
+                    set_committed_value(instance, key, value)
+
     async def _update(self,
                       *clauses: ExpressionType,
                       **values: Any) -> None:
-        statement = update(self.model).where(*clauses).values(**values)
+        key = None
+        if all(_is_synchronizable(clause, self.model) for clause in clauses) and \
+                not any(isinstance(value, ClauseElement) for value in values.values()):
+            key = _statement_key('update', self.model, clauses,
+                                 values=tuple(sorted(values)))
+        template = self._cached_statement(key, lambda: self._build_update(clauses, values))
+        if template is None:
+            statement = update(self.model).where(*clauses).values(**values)
+            async with self._transaction:
+                await self._session.execute(statement)
+            return
+
+        statement, attribute_keys = template
+        params = _clause_params(clauses)
+        params.update({f'value_{key}': value for key, value in values.items()})
         async with self._transaction:
-            await self._session.execute(statement)
+            await self._session.execute(statement, params)
+            self._synchronize_updated(clauses, attribute_keys, values)
 
     async def _exists(self, *clauses: ExpressionType) -> bool:
-        statement = exists(self.model).where(*clauses).select()
+        key = _statement_key('exists', self.model, clauses)
+        statement = self._cached_statement(
+            key, lambda: exists(self.model).where(*_parametrize(clauses)).select()
+        )
+        params = None
+        if statement is not None:
+            params = _clause_params(clauses)
+        else:
+            statement = exists(self.model).where(*clauses).select()
         async with self._transaction:
-            session_result = (await self._session.execute(statement)).scalar()
+            session_result = (await self._session.execute(statement, params)).scalar()
         return cast(bool, session_result)
 
     async def _delete(self, *clauses: ExpressionType) -> list[SQLAlchemyModel]:
@@ -151,6 +325,56 @@ class DatabaseService(Generic[SQLAlchemyModel]):  # noqa: WPS214
                 scalars().all()
         return cast(list[SQLAlchemyModel], session_result)
 
+    def _owned_clauses(self, id: int, user_id: int) -> tuple[ExpressionType, ...]:
+        return self.model.id == id, self.model.user_id == user_id
+
+    async def _raise_not_owned(self, id: int) -> NoReturn:
+        # Дополнительный запрос только когда ни одна строка не изменилась
+        if await self._exists(self.model.id == id):
+            raise EntityAccessDeniedError()
+        raise EntityNotFoundError()
+
+    async def _update_owned(self, id: int, user_id: int, **values: Any) -> None:
+        statement = update(self.model). \
+            where(*self._owned_clauses(id, user_id)). \
+            values(**values). \
+            returning(self.model.id). \
+            execution_options(synchronize_session=False)
+        async with self._transaction:
+            if (await self._session.execute(statement)).first() is None:
+                await self._raise_not_owned(id)
+
+    async def _delete_owned(self,
+                            id: int,
+                            user_id: int,
+                            links: tuple[Column, Column] | None = None) -> list[Any]:
+        """Deletes the row and, optionally, its link rows in one statement.
+
+        ``links`` is a pair of the link table column referencing this model
+        and the column whose values of the removed links are returned.
+        """
+        deleted = delete(self.model). \
+            where(*self._owned_clauses(id, user_id)). \
+            returning(self.model.id). \
+            cte('deleted')
+        statement = select(deleted.c.id)
+        if links is not None:
+            reference, returned = links
+            deleted_links = delete(reference.table). \
+                where(reference.in_(select(deleted.c.id))). \
+                returning(returned). \
+                cte('deleted_links')
+            statement = select(deleted.c.id, deleted_links.c[returned.key]). \
+                select_from(deleted). \
+                outerjoin(deleted_links, true())
+        async with self._transaction:
+            rows = (await self._session.execute(statement)).all()
+            if not rows:
+                await self._raise_not_owned(id)
+        if links is None:
+            return []
+        return [linked for _, linked in rows if linked is not None]
+
     async def _count(self, *clauses: ExpressionType) -> int:
         async with self._transaction:
             statement = select(func.count(ASTERISK)). \
@@ -158,6 +382,104 @@ class DatabaseService(Generic[SQLAlchemyModel]):  # noqa: WPS214
             async_result: AsyncResult = await self._session.execute(statement)
         return cast(int, async_result.scalar())
 
+    async def _estimate_count(self, *clauses: ExpressionType) -> int:
+        async with self._transaction:
+            if not clauses:
+                reltuples = (await self._session.execute(
+                    text("SELECT reltuples::bigint FROM pg_class "
+                         "WHERE oid = CAST(:table AS regclass)"),
+                    {"table": self.model.__tablename__}
+                )).scalar()
+                if reltuples is not None and reltuples >= 0:
+                    return cast(int, reltuples)
+            statement = select(self.model).where(*clauses). \
+                compile(dialect=postgresql.dialect(),
+                        compile_kwargs={"literal_binds": True})
+            plan = (await self._session.execute(
+                text(f"EXPLAIN (FORMAT JSON) {statement}")
+            )).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return cast(int, plan[0]["Plan"]["Plan Rows"])
+
+
+def _clause_shape(clause: Any) -> Hashable | None:
+    if not isinstance(clause, BinaryExpression) or clause.modifiers or \
+            not isinstance(clause.left, Column):
+        return None
+    right = clause.right
+    if isinstance(right, BindParameter):
+        return clause.left, clause.operator, right.expanding, type(right.type)
+    if isinstance(right, Column):
+        return clause.left, clause.operator, right
+    return None
+
+
+def _column_shape(item: Any) -> Hashable | None:
+    if isinstance(item, (Column, QueryableAttribute)):
+        return item
+    return None
+
+
+def _order_shape(item: Any) -> Hashable | None:
+    if isinstance(item, UnaryExpression) and \
+            item.modifier in (operators.asc_op, operators.desc_op) and \
+            isinstance(item.element, Column):
+        return item.element, item.modifier
+    return _column_shape(item)
+
+
+def _shapes(items: Sequence[Any] | None,
+            shape: Callable[[Any], Hashable | None] = _column_shape) -> tuple | None:
+    shapes = tuple(shape(item) for item in items or ())
+    if any(item is None for item in shapes):
+        return None
+    return shapes
+
+
+def _statement_key(kind: str,
+                   model: Type[DatabaseModel],
+                   clauses: Sequence[ExpressionType],
+                   **parts: Any) -> tuple | None:
+    clause_shapes = _shapes(clauses, _clause_shape)
+    if clause_shapes is None or any(part is None for part in parts.values()):
+        return None
+    return kind, model, clause_shapes, tuple(sorted(parts.items()))
+
+
+def _parametrize(clauses: Sequence[ExpressionType]) -> list[ExpressionType]:
+    parametrized = []
+    for index, clause in enumerate(clauses):
+        if isinstance(clause.right, BindParameter):
+            clause = BinaryExpression(clause.left,
+                                      bindparam(f'p_{index}',
+                                                type_=clause.right.type,
+                                                expanding=clause.right.expanding),
+                                      clause.operator,
+                                      type_=clause.type,
+                                      negate=clause.negate)
+        parametrized.append(clause)
+    return parametrized
+
+
+def _clause_params(clauses: Sequence[ExpressionType]) -> dict[str, Any]:
+    return {f'p_{index}': clause.right.effective_value
+            for index, clause in enumerate(clauses)
+            if isinstance(clause.right, BindParameter)}
+
+
+def _is_synchronizable(clause: Any, model: Type[DatabaseModel]) -> bool:
+    return _clause_shape(clause) is not None and \
+        isinstance(clause.right, BindParameter) and \
+        clause.operator in (operators.eq, operators.in_op) and \
+        clause.left.table is model.__table__
+
+
+def _matches(loaded: Any, operator: Any, value: Any) -> bool:
+    if operator is operators.in_op:
+        return loaded in value
+    return loaded == value
+
 
 def make_proxy_bulk_save_func(
         instances: Sequence[Any],
@@ -174,3 +496,8 @@ def make_proxy_bulk_save_func(
         )  # type: ignore
 
     return _proxy
+
+
+def chunked(items: Sequence[Any], size: int) -> Iterator[Sequence[Any]]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
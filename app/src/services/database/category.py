@@ -1,28 +1,70 @@
-from models import CategoryModel
-from services.database.base import DatabaseService
+from sqlalchemy import func, select, update
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import aliased
+
+from models import CategoryModel, CategoryToArticle
+from services.database.base import DEFAULT_LIMIT, DatabaseService
 
 
 class CategoryService(DatabaseService):
     model = CategoryModel
 
     async def get_list(self, limit: int | None = None, offset: int | None = None):
-        return await self._get_all(limit=limit if limit else 50,
+        return await self._get_all(limit=limit if limit else DEFAULT_LIMIT,
                                    offset=offset if offset else 0)
 
+    async def count(self) -> int:
+        return await self._count()
+
+    async def estimate_count(self) -> int:
+        return await self._estimate_count()
+
     async def exists_list(self, ids: list[int]):
         if not ids:
             return True
-        categories = await self._get_all(CategoryModel.id.in_(ids))  # noqa:ignore
+        categories = await self._get_all(CategoryModel.id.in_(ids),  # noqa:ignore
+                                         columns=[CategoryModel.id])
         return len(categories) == len(ids)
 
     async def get_by_id(self, id: int) -> CategoryModel:
         return await self._get_one(CategoryModel.id == id)
 
+    async def get_version(self, id: int) -> Row | None:
+        return await self._get_one(CategoryModel.id == id,
+                                   columns=[CategoryModel.edited_at,
+                                            CategoryModel.article_count])
+
     async def add(self, **kwargs) -> CategoryModel:
         return await self._add(**kwargs)
 
     async def delete_by_id(self, id: int) -> None:
         await self._delete(CategoryModel.id == id)
 
+    async def delete_owned(self, id: int, user_id: int) -> None:
+        await self._delete_owned(id, user_id,
+                                 links=(CategoryToArticle.category_id,
+                                        CategoryToArticle.article_id))
+
     async def update_by_id(self, id: int, **kwargs):
         await self._update(CategoryModel.id == id, **kwargs)
+
+    async def update_owned(self, id: int, user_id: int, **kwargs) -> None:
+        await self._update_owned(id, user_id, **kwargs)
+
+    async def reconcile_article_counts(self) -> int:
+        category = aliased(CategoryModel)
+        actual_counts = select(category.id.label('id'),
+                               func.count(CategoryToArticle.article_id).label('article_count')). \
+            outerjoin(CategoryToArticle, CategoryToArticle.category_id == category.id). \
+            group_by(category.id). \
+            subquery()
+        statement = update(CategoryModel). \
+            where(CategoryModel.id == actual_counts.c.id,
+                  CategoryModel.article_count != actual_counts.c.article_count). \
+            values(article_count=actual_counts.c.article_count,
+                   edited_at=CategoryModel.edited_at). \
+            returning(CategoryModel.id). \
+            execution_options(synchronize_session=False)
+        async with self._transaction:
+            fixed = (await self._session.execute(statement)).scalars().all()
+        return len(fixed)
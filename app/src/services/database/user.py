@@ -1,5 +1,5 @@
 from core.jwt import JWTRepository, TokenDataDTO
-from core.password import verify_password, get_password_hash
+from core.password import PasswordHasher
 from dto.token import TokenDTO, TokensDTO
 from dto.user import LoginDTO
 from models.user import UserModel
@@ -39,6 +39,7 @@ class UserService(DatabaseService):
 
     async def login(self,
                     jwt_repository: JWTRepository,
+                    password_hasher: PasswordHasher,
                     email: str,
                     password: str) -> LoginDTO:
         user: UserModel | None = await self._get_one(UserModel.email == email)
@@ -46,8 +47,8 @@ class UserService(DatabaseService):
             raise UserNotExistsError()
         if not user.is_verified:
             raise UserNotVerifiedError()
-        if not verify_password(plain_password=password,
-                               hashed_password=user.password_hash):
+        if not await password_hasher.verify(plain_password=password,
+                                            hashed_password=user.password_hash):
             raise UserBadPasswordError()
 
         user_tokens = self._create_user_tokens(jwt_repository=jwt_repository,
@@ -60,13 +61,14 @@ class UserService(DatabaseService):
                         ))
 
     async def signup(self,
+                     password_hasher: PasswordHasher,
                      email: str,
                      password: str) -> None:
         user: UserModel | None = await self._get_one(UserModel.email == email)
         if user:
             return
         await self._add(email=email,
-                        password_hash=get_password_hash(password))
+                        password_hash=await password_hasher.hash(password))
 
     async def is_exists_by_email(self, email: str) -> bool:
         return await self._exists(UserModel.email == email)
@@ -1,46 +1,31 @@
 import random
 from email.message import EmailMessage
 
-import aiosmtplib
-
 from core.settings import SETTINGS
-
-
-class SMTPSendError(Exception):
-    pass
+from services.email_queue import EmailQueue
 
 
 class EmailService:
-    def __init__(self,
-                 host: str,
-                 port: int,
-                 email: str,
-                 password: str):
-        self._host: str = host
-        self._port: int = port
-        self._email: str = email
-        self._password: str = password
+    def __init__(self, queue: EmailQueue, sender: str):
+        self._queue: EmailQueue = queue
+        self._sender: str = sender
 
     @staticmethod
-    def _generate_code() -> str:
+    def generate_code() -> str:
+        if SETTINGS.DEBUG:
+            return "123456"
         value = str(random.randint(0, 999999))
         return (6 - len(value)) * "0" + value
 
-    async def _send_message(self, receiver_email: str, code: str) -> None:
+    def _build_message(self, receiver_email: str, code: str) -> EmailMessage:
         message = EmailMessage()
-        message["From"] = self._email
+        message["From"] = self._sender
         message["To"] = receiver_email
         message["Subject"] = "Code From Test FastAPI App"
         message.set_content(f"Hello! Your one-time code: {code}")
-        try:
-            await aiosmtplib.send(message, hostname=self._host, port=self._port,
-                                  username=self._email, password=self._password)
-        except Exception:
-            raise SMTPSendError()
+        return message
 
-    async def send_code_to_email(self, email: str) -> str:
+    def send_code(self, email: str, code: str) -> None:
         if SETTINGS.DEBUG:
-            return "123456"
-        code = self._generate_code()
-        await self._send_message(receiver_email=email, code=code)
-        return code
+            return
+        self._queue.enqueue(self._build_message(receiver_email=email, code=code))
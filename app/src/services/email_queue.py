@@ -0,0 +1,195 @@
+import asyncio
+import logging
+from email.message import EmailMessage
+
+import aiosmtplib
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+# Ответы про аутентификацию относятся к сессии, а не к письму
+AUTH_ERROR_CODES = frozenset((530, 534, 535, 538))
+
+
+class EmailQueueFullError(Exception):
+    pass
+
+
+class EmailQueueStatsDTO(BaseModel):
+    queued: int
+    retrying: int
+    sent: int
+    retried: int
+    failed: int
+
+
+class _Delivery:
+    __slots__ = ('message', 'attempt')
+
+    def __init__(self, message: EmailMessage):
+        self.message: EmailMessage = message
+        self.attempt: int = 0
+
+
+class EmailQueue:
+    """Bounded in-memory outbound mail queue.
+
+    Every worker keeps its own authenticated SMTP connection open between
+    batches instead of opening a connect/TLS/AUTH session per message.
+    Failed messages are put back after an exponential backoff until
+    ``max_retries`` is exhausted.
+    """
+
+    def __init__(self,
+                 host: str,
+                 port: int,
+                 username: str | None = None,
+                 password: str | None = None,
+                 use_tls: bool = False,
+                 start_tls: bool | None = None,
+                 timeout: float = 30,
+                 workers: int = 2,
+                 maxsize: int = 1000,
+                 batch_size: int = 20,
+                 max_retries: int = 5,
+                 retry_backoff: float = 1):
+        self._host: str = host
+        self._port: int = port
+        self._username: str | None = username
+        self._password: str | None = password
+        self._use_tls: bool = use_tls
+        self._start_tls: bool | None = start_tls
+        self._timeout: float = timeout
+        self._workers_count: int = workers
+        self._batch_size: int = batch_size
+        self._max_retries: int = max_retries
+        self._retry_backoff: float = retry_backoff
+        self._queue: asyncio.Queue[_Delivery] = asyncio.Queue(maxsize=maxsize)
+        self._workers: list[asyncio.Task] = []
+        self._retries: set[asyncio.Task] = set()
+        self._sent: int = 0
+        self._retried: int = 0
+        self._failed: int = 0
+
+    def enqueue(self, message: EmailMessage) -> None:
+        try:
+            self._queue.put_nowait(_Delivery(message))
+        except asyncio.QueueFull:
+            raise EmailQueueFullError()
+
+    def start(self) -> None:
+        if self._workers:
+            return
+        self._workers = [asyncio.create_task(self._work())
+                         for _ in range(self._workers_count)]
+
+    async def stop(self, timeout: float = 10) -> None:
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Email queue stopped with %d undelivered messages",
+                           self._queue.qsize())
+        for task in (*self._workers, *self._retries):
+            task.cancel()
+        await asyncio.gather(*self._workers, *self._retries, return_exceptions=True)
+        self._workers = []
+        self._retries.clear()
+
+    def get_stats(self) -> EmailQueueStatsDTO:
+        return EmailQueueStatsDTO(queued=self._queue.qsize(),
+                                  retrying=len(self._retries),
+                                  sent=self._sent,
+                                  retried=self._retried,
+                                  failed=self._failed)
+
+    def _new_connection(self) -> aiosmtplib.SMTP:
+        return aiosmtplib.SMTP(hostname=self._host,
+                               port=self._port,
+                               use_tls=self._use_tls,
+                               start_tls=self._start_tls,
+                               timeout=self._timeout)
+
+    async def _connect(self, smtp: aiosmtplib.SMTP) -> None:
+        await smtp.connect()
+        if not (self._username and self._password):
+            return
+        # starttls() сбрасывает расширения, а без TLS EHLO ещё не отправлялся
+        await smtp.ehlo()
+        # Локальные заглушки вроде aiosmtpd AUTH не объявляют
+        if smtp.supports_extension('auth'):
+            await smtp.login(self._username, self._password)
+
+    async def _take_batch(self) -> list[_Delivery]:
+        batch = [await self._queue.get()]
+        while len(batch) < self._batch_size and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        return batch
+
+    async def _work(self) -> None:
+        smtp = self._new_connection()
+        try:
+            while True:
+                batch = await self._take_batch()
+                try:
+                    await self._send_batch(smtp, batch)
+                finally:
+                    for _ in batch:
+                        self._queue.task_done()
+        finally:
+            if smtp.is_connected:
+                smtp.close()
+
+    async def _send_batch(self, smtp: aiosmtplib.SMTP, batch: list[_Delivery]) -> None:
+        for delivery in batch:
+            try:
+                if not smtp.is_connected:
+                    await self._connect(smtp)
+                await smtp.send_message(delivery.message)
+            except aiosmtplib.SMTPRecipientsRefused:
+                # Повтор не поможет, адрес отклонён окончательно
+                self._failed += 1
+                logger.warning("Recipient refused: %s", delivery.message["To"])
+            except aiosmtplib.SMTPResponseException as ex:
+                if ex.code in AUTH_ERROR_CODES:
+                    # Письмо не виновато: переподключаемся с AUTH и повторяем
+                    logger.error("SMTP authentication failed (%d): %s",
+                                 ex.code, ex.message)
+                    if smtp.is_connected:
+                        smtp.close()
+                    self._schedule_retry(delivery)
+                    continue
+                # Соединение живо, сервер отказал только этому письму
+                logger.warning("SMTP %d for %s: %s", ex.code,
+                               delivery.message["To"], ex.message)
+                if ex.code >= 500:
+                    self._failed += 1
+                else:
+                    self._schedule_retry(delivery)
+            except (aiosmtplib.SMTPException, OSError):
+                logger.exception("Failed to send email to %s", delivery.message["To"])
+                if smtp.is_connected:
+                    smtp.close()
+                self._schedule_retry(delivery)
+            else:
+                self._sent += 1
+
+    def _schedule_retry(self, delivery: _Delivery) -> None:
+        delivery.attempt += 1
+        if delivery.attempt > self._max_retries:
+            self._failed += 1
+            logger.error("Giving up on email to %s after %d attempts",
+                         delivery.message["To"], delivery.attempt)
+            return
+        self._retried += 1
+        task = asyncio.create_task(self._retry_later(delivery))
+        self._retries.add(task)
+        task.add_done_callback(self._retries.discard)
+
+    async def _retry_later(self, delivery: _Delivery) -> None:
+        await asyncio.sleep(self._retry_backoff * 2 ** (delivery.attempt - 1))
+        try:
+            self._queue.put_nowait(delivery)
+        except asyncio.QueueFull:
+            self._failed += 1
+            logger.error("Email queue is full, dropping retry to %s",
+                         delivery.message["To"])
@@ -0,0 +1,37 @@
+import csv
+import io
+import json
+from typing import AsyncIterator, Sequence
+
+from sqlalchemy.engine import Row
+
+EXPORT_FIELDS = ('id', 'created_at', 'edited_at', 'title', 'text', 'user_id', 'categories')
+
+
+def _row_to_dict(row: Row) -> dict:
+    data = dict(row._mapping)
+    data['created_at'] = data['created_at'].isoformat()
+    data['edited_at'] = data['edited_at'].isoformat()
+    return data
+
+
+async def to_ndjson(partitions: AsyncIterator[Sequence[Row]]) -> AsyncIterator[bytes]:
+    async for rows in partitions:
+        yield ''.join(json.dumps(_row_to_dict(row), ensure_ascii=False) + '\n'
+                      for row in rows).encode()
+
+
+async def to_csv(partitions: AsyncIterator[Sequence[Row]]) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_FIELDS)
+    async for rows in partitions:
+        for row in rows:
+            data = _row_to_dict(row)
+            data['categories'] = ';'.join(str(id) for id in data['categories'])
+            writer.writerow(data[field] for field in EXPORT_FIELDS)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
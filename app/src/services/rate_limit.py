@@ -0,0 +1,48 @@
+import os
+
+from aioredis import RedisError
+
+from core.rate_limit import SlidingWindowLimiter
+from services.redis import RedisService
+
+RATE_LIMIT_KEY = 'rate:{scope}:{identity}'
+
+# Скользящее окно на sorted set: чистка, проверка и запись выполняются
+# атомарно, время берётся у Redis, чтобы воркеры не зависели от своих часов.
+# Возвращает 0, если запрос пропущен, иначе сколько миллисекунд ждать
+SLIDING_WINDOW_SCRIPT = """
+local now = redis.call('TIME')
+now = tonumber(now[1]) * 1000 + math.floor(tonumber(now[2]) / 1000)
+local window = tonumber(ARGV[1])
+local limit = tonumber(ARGV[2])
+redis.call('ZREMRANGEBYSCORE', KEYS[1], 0, now - window)
+if redis.call('ZCARD', KEYS[1]) < limit then
+    redis.call('ZADD', KEYS[1], now, ARGV[3])
+    redis.call('PEXPIRE', KEYS[1], window)
+    return 0
+end
+local oldest = redis.call('ZRANGE', KEYS[1], 0, 0, 'WITHSCORES')
+return math.max(tonumber(oldest[2]) + window - now, 1)
+"""
+
+
+class RateLimitService:
+    def __init__(self,
+                 redis_service: RedisService,
+                 local_limiter: SlidingWindowLimiter):
+        self._redis_service: RedisService = redis_service
+        self._local_limiter: SlidingWindowLimiter = local_limiter
+        self._script = redis_service.register_script(SLIDING_WINDOW_SCRIPT)
+
+    async def hit(self, scope: str, identity: str,
+                  limit: int, window: int) -> float | None:
+        """Returns seconds until the next allowed hit or None if allowed."""
+        key = RATE_LIMIT_KEY.format(scope=scope, identity=identity)
+        try:
+            retry_after_ms = await self._script(keys=[key],
+                                                args=[window * 1000, limit,
+                                                      os.urandom(8).hex()])
+        except (RedisError, OSError):
+            # Redis недоступен: ограничиваем хотя бы в пределах процесса
+            return self._local_limiter.hit(key, limit, window)
+        return retry_after_ms / 1000 if retry_after_ms else None
@@ -1,19 +1,56 @@
 import aioredis
 from aioredis import Redis
+from aioredis.client import Pipeline, Script
 
 
 class RedisService:
-    def __init__(self, connect_url: str):
-        self._redis: Redis = aioredis.from_url(url=connect_url)
+    def __init__(self,
+                 connect_url: str,
+                 max_connections: int | None = None,
+                 socket_timeout: float | None = None,
+                 socket_connect_timeout: float | None = None):
+        self._redis: Redis = aioredis.from_url(
+            url=connect_url,
+            max_connections=max_connections,
+            socket_timeout=socket_timeout,
+            socket_connect_timeout=socket_connect_timeout,
+        )
 
     async def get(self, key: str):
         return await self._redis.get(name=key)
 
-    async def set(self, key: str, value: str, expire: int):
-        return await self._redis.set(name=key, value=value, ex=expire)
+    async def getdel(self, key: str):
+        return await self._redis.execute_command('GETDEL', key)
 
-    async def remove(self, key: str):
-        return await self._redis.delete(key)
+    async def mget(self, *keys: str) -> list:
+        return await self._redis.mget(keys)
+
+    async def set(self, key: str, value: str | bytes, expire: int,
+                  nx: bool = False):
+        return await self._redis.set(name=key, value=value, ex=expire, nx=nx)
+
+    async def mset(self, mapping: dict[str, str | bytes], expire: int | None = None):
+        if expire is None:
+            return await self._redis.mset(mapping)
+        async with self.pipeline() as pipe:
+            for key, value in mapping.items():
+                pipe.set(name=key, value=value, ex=expire)
+            return await pipe.execute()
+
+    async def remove(self, *keys: str):
+        return await self._redis.delete(*keys)
+
+    async def incr(self, key: str):
+        return await self._redis.incr(name=key)
+
+    def pipeline(self, transaction: bool = True) -> Pipeline:
+        return self._redis.pipeline(transaction=transaction)
+
+    def register_script(self, script: str) -> Script:
+        return self._redis.register_script(script)
+
+    async def ping(self):
+        return await self._redis.ping()
 
     async def close(self):
         await self._redis.close()
@@ -0,0 +1,62 @@
+import datetime
+import json
+
+from aioredis import RedisError
+
+from core.cache import TTLCache
+from models import UserModel
+from services.redis import RedisService
+
+USER_KEY = 'cache:user:{id}'
+USER_FIELDS = ('id', 'email', 'is_verified', 'created_at')
+
+
+class UserCacheService:
+    def __init__(self,
+                 local_cache: TTLCache,
+                 redis_service: RedisService | None = None,
+                 redis_ttl: int = 300):
+        self._local_cache: TTLCache = local_cache
+        self._redis_service: RedisService | None = redis_service
+        self._redis_ttl: int = redis_ttl
+
+    @staticmethod
+    def _dump(user: UserModel) -> dict:
+        return {field: getattr(user, field) for field in USER_FIELDS}
+
+    @staticmethod
+    def _load(data: dict) -> UserModel:
+        return UserModel(**data)
+
+    async def get(self, id: int) -> UserModel | None:
+        data: dict | None = self._local_cache.get(id)
+        if data is None and self._redis_service is not None:
+            try:
+                raw = await self._redis_service.get(USER_KEY.format(id=id))
+            except RedisError:
+                raw = None
+            if raw is not None:
+                data = json.loads(raw)
+                if data['created_at'] is not None:
+                    data['created_at'] = datetime.datetime.fromisoformat(data['created_at'])
+                self._local_cache.set(id, data)
+        return self._load(data) if data is not None else None
+
+    async def set(self, user: UserModel) -> None:
+        data = self._dump(user)
+        self._local_cache.set(user.id, data)
+        if self._redis_service is not None:
+            try:
+                await self._redis_service.set(key=USER_KEY.format(id=user.id),
+                                              value=json.dumps(data, default=str),
+                                              expire=self._redis_ttl)
+            except RedisError:
+                pass
+
+    async def invalidate(self, id: int) -> None:
+        self._local_cache.pop(id)
+        if self._redis_service is not None:
+            try:
+                await self._redis_service.remove(USER_KEY.format(id=id))
+            except RedisError:
+                pass